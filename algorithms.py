@@ -1,116 +1,259 @@
 # algorithms.py
 import time
 import sys
+import random
+import operator
+import statistics
+from functools import reduce
+from itertools import islice
+from array import array
 
-def quick_sort(arr, show_progress=False):
-    """Quick sort implementation with progress tracking"""
-    if len(arr) <= 1:
+# NumPy is optional; without it only the pure-Python algorithms are offered
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Progress updates are throttled to at most this many per second
+PROGRESS_UPDATES_PER_SECOND = 10
+
+class ProgressReporter:
+    """Time-throttled progress sink shared by the *_with_progress algorithms.
+
+    Updates arriving faster than max_updates_per_second are dropped (except
+    the final 100%), so reporting costs a clock read instead of terminal or
+    network I/O. With no on_progress callback a progress bar is printed;
+    otherwise on_progress(percent, detail) is called.
+    """
+    def __init__(self, label, on_progress=None, bar_length=30,
+                 max_updates_per_second=PROGRESS_UPDATES_PER_SECOND):
+        self.label = label
+        self.on_progress = on_progress
+        self.bar_length = bar_length
+        self.interval = 1.0 / max_updates_per_second
+        self.last_update = 0.0
+        self.printed = False
+    
+    def update(self, percent, detail=''):
+        """Report progress, dropping the update if the last one was too recent"""
+        now = time.perf_counter()
+        if percent < 100 and now - self.last_update < self.interval:
+            return
+        self.last_update = now
+        
+        if self.on_progress:
+            self.on_progress(percent, detail)
+            return
+        
+        filled = int(self.bar_length * percent / 100)
+        bar = '=' * filled + '-' * (self.bar_length - filled)
+        suffix = f' | {detail}' if detail else ''
+        print(f'\r{self.label}: [{bar}] {percent:.1f}%{suffix}', end='')
+        self.printed = True
+    
+    def finish(self, message):
+        """Report completion"""
+        self.update(100.0)
+        if not self.on_progress:
+            print(f"\n{message}" if self.printed else message)
+
+# Ranges at or below this size are finished with insertion sort
+INSERTION_SORT_CUTOFF = 16
+
+def _insertion_sort_range(arr, lo, hi):
+    """Insertion sort arr[lo:hi] in place"""
+    for i in range(lo + 1, hi):
+        key = arr[i]
+        j = i - 1
+        while j >= lo and key < arr[j]:
+            arr[j + 1] = arr[j]
+            j -= 1
+        arr[j + 1] = key
+
+def _heap_sort_range(arr, lo, hi):
+    """Iterative heap sort of arr[lo:hi] in place (introsort fallback)"""
+    def sift_down(root, end):
+        while True:
+            child = 2 * (root - lo) + 1 + lo
+            if child >= end:
+                return
+            if child + 1 < end and arr[child] < arr[child + 1]:
+                child += 1
+            if arr[root] >= arr[child]:
+                return
+            arr[root], arr[child] = arr[child], arr[root]
+            root = child
+    
+    n = hi - lo
+    for i in range(lo + n // 2 - 1, lo - 1, -1):
+        sift_down(i, hi)
+    for end in range(hi - 1, lo, -1):
+        arr[lo], arr[end] = arr[end], arr[lo]
+        sift_down(lo, end)
+
+def _introsort(arr, on_range_done=None):
+    """In-place iterative introsort.
+
+    Median-of-three pivot with a three-way partition (so runs of equal keys
+    are finished in one pass), insertion sort for small ranges and a heap
+    sort fallback once a range exceeds its depth budget. The smaller side
+    is always handled first, so the explicit stack stays O(log n).
+    on_range_done(count) is called as elements reach their final place.
+    """
+    n = len(arr)
+    if n <= 1:
         return arr
     
+    stack = [(0, n, 2 * n.bit_length())]
+    while stack:
+        lo, hi, depth = stack.pop()
+        
+        while hi - lo > INSERTION_SORT_CUTOFF:
+            if depth == 0:
+                _heap_sort_range(arr, lo, hi)
+                break
+            depth -= 1
+            
+            # Median of three
+            mid = (lo + hi) // 2
+            a, b, c = arr[lo], arr[mid], arr[hi - 1]
+            if a < b:
+                pivot = b if b < c else (c if a < c else a)
+            else:
+                pivot = a if a < c else (c if b < c else b)
+            
+            # Three-way partition: [lo, lt) < pivot, [lt, gt] == pivot, (gt, hi) > pivot
+            lt, i, gt = lo, lo, hi - 1
+            while i <= gt:
+                value = arr[i]
+                if value < pivot:
+                    arr[lt], arr[i] = value, arr[lt]
+                    lt += 1
+                    i += 1
+                elif value > pivot:
+                    arr[gt], arr[i] = value, arr[gt]
+                    gt -= 1
+                else:
+                    i += 1
+            
+            if on_range_done:
+                on_range_done(gt + 1 - lt)
+            
+            # Loop on the smaller side, defer the larger one
+            if lt - lo < hi - gt - 1:
+                stack.append((gt + 1, hi, depth))
+                hi = lt
+            else:
+                stack.append((lo, lt, depth))
+                lo = gt + 1
+        else:
+            _insertion_sort_range(arr, lo, hi)
+        
+        if on_range_done:
+            on_range_done(hi - lo)
+    
+    return arr
+
+def quick_sort(arr, show_progress=False):
+    """In-place introsort-style quick sort"""
     if show_progress:
         print(f"Quick Sort: {len(arr)} elements")
     
-    pivot = arr[len(arr) // 2]
-    left = [x for x in arr if x < pivot]
-    middle = [x for x in arr if x == pivot]
-    right = [x for x in arr if x > pivot]
-    
-    return quick_sort(left, show_progress) + middle + quick_sort(right, show_progress)
+    return _introsort(arr)
 
-def quick_sort_with_progress(arr):
+def quick_sort_with_progress(arr, on_progress=None):
     """Quick sort with visual progress"""
-    if len(arr) <= 1:
-        return arr
+    n = len(arr)
+    print(f"Quick Sort started on {n} elements")
+    reporter = ProgressReporter("Quick Sort", on_progress, bar_length=20)
+    placed = 0
     
-    max_depth = len(arr).bit_length()
-    print(f"Quick Sort started on {len(arr)} elements")
-    print(f"Estimated depth: {max_depth} levels")
+    def on_range_done(count):
+        nonlocal placed
+        placed += count
+        reporter.update((placed / n) * 100, f"Placed: {placed}/{n}")
     
-    def _quick_sort(arr, depth=0):
-        if len(arr) <= 1:
-            return arr
-        
-        pivot = arr[len(arr) // 2]
-        left = [x for x in arr if x < pivot]
-        middle = [x for x in arr if x == pivot]
-        right = [x for x in arr if x > pivot]
+    result = _introsort(arr, on_range_done)
+    reporter.finish("Quick Sort completed!")
+    return result
+
+# Bottom-up merge sort starts from insertion-sorted runs of this size
+MERGE_SORT_RUN = 32
+
+def _merge_pass(src, dst, width, n):
+    """Merge adjacent runs of `width` from src into dst"""
+    for lo in range(0, n, 2 * width):
+        mid = min(lo + width, n)
+        hi = min(lo + 2 * width, n)
+        i, j, k = lo, mid, lo
         
-        # Show progress
-        progress = (depth / max_depth) * 100 if max_depth > 0 else 0
-        bar_length = 20
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rQuick Sort: [{bar}] {progress:.1f}% | Depth: {depth}', end='')
+        if mid >= hi or src[mid - 1] <= src[mid]:
+            # Single run or already in order
+            dst[lo:hi] = src[lo:hi]
+            continue
         
-        sorted_left = _quick_sort(left, depth + 1)
-        sorted_right = _quick_sort(right, depth + 1)
+        while i < mid and j < hi:
+            if src[j] < src[i]:
+                dst[k] = src[j]
+                j += 1
+            else:
+                dst[k] = src[i]
+                i += 1
+            k += 1
         
-        return sorted_left + middle + sorted_right
-    
-    result = _quick_sort(arr)
-    print(f"\nQuick Sort completed!")
-    return result
+        if i < mid:
+            dst[k:hi] = src[i:mid]
+        else:
+            dst[k:hi] = src[j:hi]
 
-def merge_sort(arr, show_progress=False):
-    """Merge sort implementation"""
-    if len(arr) <= 1:
+def _bottom_up_merge_sort(arr, on_pass_done=None):
+    """Iterative merge sort using one ping-pong buffer.
+
+    Runs are merged back and forth between arr and a single buffer of the
+    same size, so the extra memory is exactly n slots no matter how many
+    passes are needed. on_pass_done(width, n) is called after every pass.
+    """
+    n = len(arr)
+    if n <= 1:
         return arr
     
-    if show_progress:
-        print(f"Merge Sort: {len(arr)} elements")
+    for lo in range(0, n, MERGE_SORT_RUN):
+        _insertion_sort_range(arr, lo, min(lo + MERGE_SORT_RUN, n))
     
-    mid = len(arr) // 2
-    left = merge_sort(arr[:mid], show_progress)
-    right = merge_sort(arr[mid:], show_progress)
+    src, dst = arr, [0] * n
+    width = MERGE_SORT_RUN
+    while width < n:
+        _merge_pass(src, dst, width, n)
+        src, dst = dst, src
+        width *= 2
+        if on_pass_done:
+            on_pass_done(width, n)
     
-    return _merge(left, right)
+    if src is not arr:
+        arr[:] = src
+    return arr
 
-def merge_sort_with_progress(arr):
-    """Merge sort with visual progress"""
-    if len(arr) <= 1:
-        return arr
-    
-    max_level = len(arr).bit_length()
-    print(f"Merge Sort started on {len(arr)} elements")
-    print(f"Estimated levels: {max_level}")
-    
-    def _merge_sort(arr, level=0):
-        if len(arr) <= 1:
-            return arr
-        
-        mid = len(arr) // 2
-        left = _merge_sort(arr[:mid], level + 1)
-        right = _merge_sort(arr[mid:], level + 1)
-        
-        # Show progress
-        if max_level > 0:
-            progress = (level / max_level) * 100
-            bar_length = 20
-            filled = int(bar_length * progress / 100)
-            bar = '=' * filled + '-' * (bar_length - filled)
-            print(f'\rMerge Sort: [{bar}] {progress:.1f}% | Level: {level}', end='')
-        
-        return _merge(left, right)
+def merge_sort(arr, show_progress=False):
+    """Bottom-up merge sort implementation"""
+    if show_progress:
+        print(f"Merge Sort: {len(arr)} elements")
     
-    result = _merge_sort(arr)
-    print(f"\nMerge Sort completed!")
-    return result
+    return _bottom_up_merge_sort(arr)
 
-def _merge(left, right):
-    """Merge helper for merge sort"""
-    result = []
-    i = j = 0
+def merge_sort_with_progress(arr, on_progress=None):
+    """Merge sort with visual progress"""
+    n = len(arr)
+    max_level = max(1, (max(n, 1) - 1) // MERGE_SORT_RUN).bit_length()
+    print(f"Merge Sort started on {n} elements")
+    print(f"Merge passes: {max_level}")
+    reporter = ProgressReporter("Merge Sort", on_progress, bar_length=20)
     
-    while i < len(left) and j < len(right):
-        if left[i] < right[j]:
-            result.append(left[i])
-            i += 1
-        else:
-            result.append(right[j])
-            j += 1
+    def on_pass_done(width, n):
+        level = (width // MERGE_SORT_RUN).bit_length() - 1
+        reporter.update(min(100.0, (level / max_level) * 100), f"Level: {level}")
     
-    result.extend(left[i:])
-    result.extend(right[j:])
+    result = _bottom_up_merge_sort(arr, on_pass_done)
+    reporter.finish("Merge Sort completed!")
     return result
 
 def bubble_sort(arr, show_progress=False):
@@ -129,12 +272,14 @@ def bubble_sort(arr, show_progress=False):
             break
     return arr
 
-def bubble_sort_with_progress(arr):
+def bubble_sort_with_progress(arr, on_progress=None):
     """Bubble sort with detailed progress"""
     n = len(arr)
     print(f"Bubble Sort started on {n} elements")
     print(f"Total passes needed: ~{n}")
+    reporter = ProgressReporter("Bubble Sort", on_progress)
     
+    passes = 0
     for i in range(n):
         swapped = False
         
@@ -142,23 +287,15 @@ def bubble_sort_with_progress(arr):
             if arr[j] > arr[j + 1]:
                 arr[j], arr[j + 1] = arr[j + 1], arr[j]
                 swapped = True
-        
-        # Show progress after each pass
-        progress = ((i + 1) / n) * 100
-        bar_length = 30
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
+        passes = i + 1
         
         # Show some array samples to visualize sorting
-        sample_start = arr[:3] if len(arr) >= 3 else arr
-        sample_end = arr[-3:] if len(arr) >= 3 else []
-        
-        print(f'\rBubble Sort: [{bar}] {progress:.1f}% | Pass {i+1}/{n} | Sample: {sample_start}...{sample_end}', end='')
+        reporter.update((passes / n) * 100, f"Pass {passes}/{n} | Sample: {arr[:3]}...{arr[-3:]}")
         
         if not swapped:
             break
     
-    print(f"\nBubble Sort completed after {i+1} passes!")
+    reporter.finish(f"Bubble Sort completed after {passes} passes!")
     return arr
 
 def heap_sort(arr, show_progress=False):
@@ -194,12 +331,13 @@ def heap_sort(arr, show_progress=False):
     
     return arr
 
-def heap_sort_with_progress(arr):
+def heap_sort_with_progress(arr, on_progress=None):
     """Heap sort with progress tracking"""
     n = len(arr)
     print(f"Heap Sort started on {n} elements")
+    reporter = ProgressReporter("Heap Sort", on_progress, bar_length=25)
     
-    def heapify(arr, n, i, progress_callback=None):
+    def heapify(arr, n, i):
         largest = i
         left = 2 * i + 1
         right = 2 * i + 2
@@ -212,28 +350,20 @@ def heap_sort_with_progress(arr):
 
         if largest != i:
             arr[i], arr[largest] = arr[largest], arr[i]
-            heapify(arr, n, largest, progress_callback)
+            heapify(arr, n, largest)
     
     # Build max heap
     for i in range(n // 2 - 1, -1, -1):
         heapify(arr, n, i)
-        progress = ((n // 2 - i) / (n // 2)) * 50
-        bar_length = 25
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rHeap Sort: [{bar}] {progress:.1f}% | Building heap', end='')
+        reporter.update(((n // 2 - i) / (n // 2)) * 50, "Building heap")
     
     # Extract elements
     for i in range(n - 1, 0, -1):
         arr[i], arr[0] = arr[0], arr[i]
         heapify(arr, i, 0)
-        progress = 50 + ((n - i) / n) * 50
-        bar_length = 25
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rHeap Sort: [{bar}] {progress:.1f}% | Extracting elements', end='')
+        reporter.update(50 + ((n - i) / n) * 50, "Extracting elements")
     
-    print(f"\nHeap Sort completed!")
+    reporter.finish("Heap Sort completed!")
     return arr
 
 def insertion_sort(arr, show_progress=False):
@@ -250,10 +380,11 @@ def insertion_sort(arr, show_progress=False):
         arr[j + 1] = key
     return arr
 
-def insertion_sort_with_progress(arr):
+def insertion_sort_with_progress(arr, on_progress=None):
     """Insertion sort with progress tracking"""
     n = len(arr)
     print(f"Insertion Sort started on {n} elements")
+    reporter = ProgressReporter("Insertion Sort", on_progress)
     
     for i in range(1, n):
         key = arr[i]
@@ -263,14 +394,9 @@ def insertion_sort_with_progress(arr):
             j -= 1
         arr[j + 1] = key
         
-        # Show progress
-        progress = (i / n) * 100
-        bar_length = 30
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rInsertion Sort: [{bar}] {progress:.1f}% | Element {i}/{n}', end='')
-    
-    print(f"\nInsertion Sort completed!")
+        reporter.update((i / n) * 100, f"Element {i}/{n}")
+    
+    reporter.finish("Insertion Sort completed!")
     return arr
 
 def selection_sort(arr, show_progress=False):
@@ -286,10 +412,11 @@ def selection_sort(arr, show_progress=False):
         arr[i], arr[min_idx] = arr[min_idx], arr[i]
     return arr
 
-def selection_sort_with_progress(arr):
+def selection_sort_with_progress(arr, on_progress=None):
     """Selection sort with progress tracking"""
     n = len(arr)
     print(f"Selection Sort started on {n} elements")
+    reporter = ProgressReporter("Selection Sort", on_progress)
     
     for i in range(n):
         min_idx = i
@@ -298,14 +425,9 @@ def selection_sort_with_progress(arr):
                 min_idx = j
         arr[i], arr[min_idx] = arr[min_idx], arr[i]
         
-        # Show progress
-        progress = (i / n) * 100
-        bar_length = 30
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rSelection Sort: [{bar}] {progress:.1f}% | Pass {i+1}/{n}', end='')
-    
-    print(f"\nSelection Sort completed!")
+        reporter.update((i / n) * 100, f"Pass {i+1}/{n}")
+    
+    reporter.finish("Selection Sort completed!")
     return arr
 
 def tim_sort(arr, show_progress=False):
@@ -314,23 +436,313 @@ def tim_sort(arr, show_progress=False):
         print(f"Tim Sort (Python built-in): {len(arr)} elements")
     return sorted(arr)
 
-def tim_sort_with_progress(arr):
-    """Tim sort with progress simulation"""
+def tim_sort_with_progress(arr, on_progress=None):
+    """Tim sort with start/finish progress"""
     print(f"Tim Sort (Python built-in) started on {len(arr)} elements")
     print("Note: Built-in sort doesn't show internal progress")
+    reporter = ProgressReporter("Tim Sort", on_progress)
     
-    # Simulate progress for consistency
-    for i in range(101):
-        progress = i
-        bar_length = 30
-        filled = int(bar_length * progress / 100)
-        bar = '=' * filled + '-' * (bar_length - filled)
-        print(f'\rTim Sort: [{bar}] {progress:.1f}%', end='')
-        if i < 100:
-            time.sleep(0.01)  # Brief pause to show progress
-    
-    print(f"\nTim Sort completed!")
-    return sorted(arr)
+    result = sorted(arr)
+    reporter.finish("Tim Sort completed!")
+    return result
+
+# Counting sort is used while the value range is at most this many times the input size
+COUNTING_SORT_MAX_SPAN_FACTOR = 4
+
+def _radix_digit_bits(span, n):
+    """Digit width for LSD radix sort: as few passes as possible without
+    letting the bucket count outgrow the input"""
+    total_bits = max(1, span.bit_length())
+    max_digit_bits = max(8, min(16, n.bit_length()))
+    passes = -(-total_bits // max_digit_bits)
+    return -(-total_bits // passes), passes
+
+def counting_sort(arr, show_progress=False):
+    """Counting sort for integers in a bounded range"""
+    if len(arr) <= 1:
+        return arr
+    
+    low, high = min(arr), max(arr)
+    if high - low > COUNTING_SORT_MAX_SPAN_FACTOR * len(arr):
+        # Range too wide for a count table, radix sort handles it in a few passes
+        return radix_sort(arr, show_progress)
+    
+    if show_progress:
+        print(f"Counting Sort: {len(arr)} elements, range {low}..{high}")
+    
+    counts = [0] * (high - low + 1)
+    for x in arr:
+        counts[x - low] += 1
+    
+    result = []
+    for offset, count in enumerate(counts):
+        if count:
+            result.extend([low + offset] * count)
+    return result
+
+def counting_sort_with_progress(arr, on_progress=None):
+    """Counting sort with progress tracking"""
+    n = len(arr)
+    print(f"Counting Sort started on {n} elements")
+    reporter = ProgressReporter("Counting Sort", on_progress)
+    if n <= 1:
+        reporter.finish("Counting Sort completed!")
+        return arr
+    
+    low, high = min(arr), max(arr)
+    if high - low > COUNTING_SORT_MAX_SPAN_FACTOR * n:
+        print(f"Value range {low}..{high} too wide for counting, switching to radix sort")
+        return radix_sort_with_progress(arr, on_progress)
+    print(f"Value range: {low}..{high} ({high - low + 1} counters)")
+    
+    counts = [0] * (high - low + 1)
+    for x in arr:
+        counts[x - low] += 1
+    reporter.update(50.0, "Counted")
+    
+    result = []
+    for offset, count in enumerate(counts):
+        if count:
+            result.extend([low + offset] * count)
+    
+    reporter.finish("Counting Sort completed!")
+    return result
+
+def radix_sort(arr, show_progress=False):
+    """LSD radix sort with digit width picked from the value range"""
+    if len(arr) <= 1:
+        return arr
+    
+    low = min(arr)
+    span = max(arr) - low
+    digit_bits, passes = _radix_digit_bits(span, len(arr))
+    mask = (1 << digit_bits) - 1
+    
+    if show_progress:
+        print(f"Radix Sort: {len(arr)} elements, {passes} passes of {digit_bits} bits")
+    
+    # Work on offsets from the minimum so negative numbers need no special case
+    keys = [x - low for x in arr]
+    for shift in range(0, digit_bits * passes, digit_bits):
+        buckets = [[] for _ in range(mask + 1)]
+        for key in keys:
+            buckets[(key >> shift) & mask].append(key)
+        keys = [key for bucket in buckets for key in bucket]
+    
+    return [key + low for key in keys]
+
+def radix_sort_with_progress(arr, on_progress=None):
+    """LSD radix sort with progress tracking"""
+    n = len(arr)
+    print(f"Radix Sort started on {n} elements")
+    reporter = ProgressReporter("Radix Sort", on_progress)
+    if n <= 1:
+        reporter.finish("Radix Sort completed!")
+        return arr
+    
+    low = min(arr)
+    span = max(arr) - low
+    digit_bits, passes = _radix_digit_bits(span, n)
+    mask = (1 << digit_bits) - 1
+    print(f"Digit width: {digit_bits} bits | Passes: {passes}")
+    
+    keys = [x - low for x in arr]
+    for i, shift in enumerate(range(0, digit_bits * passes, digit_bits)):
+        buckets = [[] for _ in range(mask + 1)]
+        for key in keys:
+            buckets[(key >> shift) & mask].append(key)
+        keys = [key for bucket in buckets for key in bucket]
+        reporter.update(((i + 1) / passes) * 100, f"Pass {i+1}/{passes}")
+    
+    reporter.finish("Radix Sort completed!")
+    return [key + low for key in keys]
+
+def _np_values(arr):
+    """arr as a NumPy integer array; arrays and memoryviews are used without a copy"""
+    values = np.asarray(arr)
+    return values if values.dtype.kind in 'iu' else values.astype(np.int64)
+
+def _np_sort(arr, kind, label, show_progress):
+    """Shared body of the np.sort backends.
+
+    Like np_radix_sort, it returns an ndarray of the input's dtype, so a
+    result can be sent from its buffer; callers that need a list convert it.
+    """
+    if show_progress:
+        print(f"{label}: {len(arr)} elements")
+    return np.sort(_np_values(arr), kind=kind)
+
+def np_quick_sort(arr, show_progress=False):
+    """NumPy quicksort (introsort)"""
+    return _np_sort(arr, 'quicksort', "NumPy Quick Sort", show_progress)
+
+def np_merge_sort(arr, show_progress=False):
+    """NumPy mergesort"""
+    return _np_sort(arr, 'mergesort', "NumPy Merge Sort", show_progress)
+
+def np_heap_sort(arr, show_progress=False):
+    """NumPy heapsort"""
+    return _np_sort(arr, 'heapsort', "NumPy Heap Sort", show_progress)
+
+def np_stable_sort(arr, show_progress=False):
+    """NumPy stable sort (radix sort for small ints, timsort otherwise)"""
+    return _np_sort(arr, 'stable', "NumPy Stable Sort", show_progress)
+
+def np_radix_sort(arr, show_progress=False):
+    """Vectorized counting sort for narrow ranges, 16-bit LSD radix sort otherwise"""
+    source = _np_values(arr)
+    dtype = source.dtype
+    values = source.astype(np.int64)
+    if len(values) <= 1:
+        return values.astype(dtype)
+    
+    low, high = int(values.min()), int(values.max())
+    span = high - low
+    
+    if span <= COUNTING_SORT_MAX_SPAN_FACTOR * len(values):
+        if show_progress:
+            print(f"NumPy Counting Sort: {len(values)} elements, range {low}..{high}")
+        counts = np.bincount(values - low, minlength=span + 1)
+        return np.repeat(np.arange(low, high + 1, dtype=dtype), counts)
+    
+    passes = (span.bit_length() + 15) // 16
+    if show_progress:
+        print(f"NumPy Radix Sort: {len(values)} elements, {passes} x 16-bit passes")
+    
+    keys = (values - low).astype(np.uint64)
+    for shift in range(0, 16 * passes, 16):
+        # A stable argsort on uint16 digits runs as a radix sort inside NumPy
+        digits = ((keys >> np.uint64(shift)) & np.uint64(0xFFFF)).astype(np.uint16)
+        keys = keys[np.argsort(digits, kind='stable')]
+    return (keys.astype(np.int64) + low).astype(dtype)
+
+# Verification works through the data this many numbers at a time
+VERIFY_BLOCK_SIZE = 1 << 20
+FINGERPRINT_MASK = (1 << 64) - 1
+
+def _verify_blocks(values):
+    """Yield int64 NumPy blocks of values, which may be a list, array, memoryview or ndarray"""
+    if isinstance(values, memoryview):
+        values = np.frombuffer(values, dtype=values.format)
+    elif isinstance(values, array):
+        values = np.frombuffer(values, dtype=values.typecode)
+    for start in range(0, len(values), VERIFY_BLOCK_SIZE):
+        yield np.asarray(values[start:start + VERIFY_BLOCK_SIZE], dtype=np.int64)
+
+def is_sorted(values):
+    """True if values are in non-decreasing order, without a Python-level loop"""
+    if np is None or not isinstance(values, (array, memoryview, np.ndarray)):
+        # Converting a list to NumPy costs as much as comparing it in C
+        return all(map(operator.le, values, islice(values, 1, None)))
+    
+    previous = None
+    for block in _verify_blocks(values):
+        if previous is not None and len(block) and previous > block[0]:
+            return False
+        if not np.all(block[:-1] <= block[1:]):
+            return False
+        if len(block):
+            previous = block[-1]
+    return True
+
+def fingerprint(values):
+    """Order-independent fingerprint of a multiset of integers.
+
+    [count, sum, sum of squares, xor], each modulo 2**64: any permutation of
+    the values gives the same fingerprint, while losing, duplicating or
+    changing values almost always changes it. NumPy and pure Python agree.
+    """
+    if np is None:
+        return [len(values),
+                sum(values) & FINGERPRINT_MASK,
+                sum(map(operator.mul, values, values)) & FINGERPRINT_MASK,
+                reduce(operator.xor, values, 0) & FINGERPRINT_MASK]
+    
+    total = squares = xor = np.uint64(0)
+    with np.errstate(over='ignore'):
+        for block in _verify_blocks(values):
+            block = block.view(np.uint64)
+            total += block.sum(dtype=np.uint64)
+            squares += (block * block).sum(dtype=np.uint64)
+            xor ^= np.bitwise_xor.reduce(block) if len(block) else np.uint64(0)
+    return [len(values), int(total), int(squares), int(xor)]
+
+# auto: measurements are taken on this many sampled positions
+AUTO_SAMPLE_SIZE = 1024
+# Inputs this small just get insertion sort
+AUTO_SMALL_SIZE = 32
+# At most this fraction of sampled neighbours out of order counts as a few long runs
+AUTO_PRESORTED_RATIO = 0.05
+
+def measure_presortedness(arr, sample_size=AUTO_SAMPLE_SIZE):
+    """Cheap O(sample_size) measurements of how an input is laid out.
+
+    Positions are sampled with a generator seeded by the length, so the same
+    input always gets the same measurements (and the same auto decision).
+    """
+    n = len(arr)
+    stats = {'size': n}
+    if n < 2:
+        return stats
+    
+    rng = random.Random(n)
+    k = min(sample_size, n - 1)
+    neighbours = [rng.randrange(n - 1) for _ in range(k)]
+    descents = sum(1 for i in neighbours if arr[i] > arr[i + 1])
+    ascents = sum(1 for i in neighbours if arr[i] < arr[i + 1])
+    pairs = [sorted(rng.sample(range(n), 2)) for _ in range(k)]
+    inversions = sum(1 for i, j in pairs if arr[i] > arr[j])
+    
+    stats.update({
+        'descent_ratio': descents / k,
+        'ascent_ratio': ascents / k,
+        'estimated_runs': 1 + round(descents / k * (n - 1)),
+        'inversion_ratio': inversions / k,
+        'min': min(arr),
+        'max': max(arr)
+    })
+    return stats
+
+def choose_algorithm(arr):
+    """Pick the algorithm auto dispatches to, from measure_presortedness.
+
+    Returns a dict with the chosen 'algorithm', the 'reason' and the
+    measurements, so the decision can be reported alongside the result.
+    """
+    stats = measure_presortedness(arr)
+    n = stats['size']
+    
+    if n <= AUTO_SMALL_SIZE:
+        algorithm, reason = 'insertionsort', 'small input'
+    elif stats['descent_ratio'] <= AUTO_PRESORTED_RATIO:
+        # Timsort merges the existing runs in close to linear time
+        algorithm, reason = 'timsort', 'nearly sorted (few ascending runs)'
+    elif stats['ascent_ratio'] <= AUTO_PRESORTED_RATIO:
+        # ...and reverses descending runs before merging them
+        algorithm, reason = 'timsort', 'nearly reversed (few descending runs)'
+    elif stats['max'] - stats['min'] <= COUNTING_SORT_MAX_SPAN_FACTOR * n:
+        algorithm = 'np_radix' if 'np_radix' in NUMPY_ALGORITHMS else 'countingsort'
+        reason = 'narrow value range'
+    else:
+        algorithm = 'np_quicksort' if 'np_quicksort' in NUMPY_ALGORITHMS else 'timsort'
+        reason = 'no exploitable structure'
+    
+    return dict(stats, algorithm=algorithm, reason=reason)
+
+def auto_sort(arr, show_progress=False):
+    """Measure the input and sort it with the algorithm that suits it best"""
+    decision = choose_algorithm(arr)
+    if show_progress:
+        print(f"Auto: {decision['algorithm']} ({decision['reason']})")
+    return get_sort_function(decision['algorithm'])(arr, show_progress=show_progress)
+
+def auto_sort_with_progress(arr, on_progress=None):
+    """Auto sort, reporting progress through the chosen algorithm"""
+    decision = choose_algorithm(arr)
+    print(f"Auto picked {decision['algorithm']}: {decision['reason']}")
+    if decision['algorithm'] in ALGORITHMS:
+        return ALGORITHMS[decision['algorithm']][0](arr, on_progress=on_progress)
+    return get_sort_function(decision['algorithm'])(arr, show_progress=True)
 
 # Algorithm configurations
 ALGORITHMS = {
@@ -341,6 +753,9 @@ ALGORITHMS = {
     'insertionsort': (insertion_sort_with_progress, "Insertion Sort (O(n²))"),
     'selectionsort': (selection_sort_with_progress, "Selection Sort (O(n²))"),
     'timsort': (tim_sort_with_progress, "Tim Sort (Python built-in)"),
+    'countingsort': (counting_sort_with_progress, "Counting Sort (O(n + k) for bounded integers)"),
+    'radixsort': (radix_sort_with_progress, "Radix Sort (LSD, O(n * passes))"),
+    'auto': (auto_sort_with_progress, "Auto (picked per chunk from its presortedness)"),
 }
 
 # Simple versions without progress for internal use
@@ -352,36 +767,62 @@ SIMPLE_ALGORITHMS = {
     'insertionsort': insertion_sort,
     'selectionsort': selection_sort,
     'timsort': tim_sort,
+    'countingsort': counting_sort,
+    'radixsort': radix_sort,
+    'auto': auto_sort,
 }
 
+# Vectorized NumPy backends, only offered where NumPy is installed
+NUMPY_ALGORITHMS = {
+    'np_quicksort': (np_quick_sort, "NumPy Quick Sort (introsort, vectorized)"),
+    'np_mergesort': (np_merge_sort, "NumPy Merge Sort (vectorized)"),
+    'np_heapsort': (np_heap_sort, "NumPy Heap Sort (vectorized)"),
+    'np_stable': (np_stable_sort, "NumPy Stable Sort (radix/timsort, vectorized)"),
+    'np_radix': (np_radix_sort, "NumPy Counting/Radix Sort (O(n) for bounded integers)"),
+} if np is not None else {}
+
+def get_sort_function(name):
+    """Get the progress-free sort function for an algorithm from any backend"""
+    if name in NUMPY_ALGORITHMS:
+        return NUMPY_ALGORITHMS[name][0]
+    return SIMPLE_ALGORITHMS.get(name, SIMPLE_ALGORITHMS['quicksort'])
+
 def get_algorithm_info():
     """Get information about all available algorithms"""
     info = {}
     for name, (_, description) in ALGORITHMS.items():
         info[name] = description
+    for name, (_, description) in NUMPY_ALGORITHMS.items():
+        info[name] = description
     return info
 
-def benchmark_algorithm(algorithm_name, data):
-    """Benchmark a specific algorithm on given data"""
-    if algorithm_name not in SIMPLE_ALGORITHMS:
+def benchmark_algorithm(algorithm_name, data, repeats=1, warmups=0):
+    """Benchmark a specific algorithm on given data.
+
+    Every run sorts a fresh copy; warmup runs are not timed. 'time' is the
+    median of the timed runs, all of which are listed under 'times'.
+    """
+    if algorithm_name not in SIMPLE_ALGORITHMS and algorithm_name not in NUMPY_ALGORITHMS:
         raise ValueError(f"Unknown algorithm: {algorithm_name}")
     
-    algorithm = SIMPLE_ALGORITHMS[algorithm_name]
+    algorithm = get_sort_function(algorithm_name)
     
-    # Create a copy to avoid modifying original
-    test_data = data.copy()
+    for _ in range(warmups):
+        algorithm(data.copy(), show_progress=False)
     
-    # Time the algorithm
-    start_time = time.time()
-    result = algorithm(test_data, show_progress=False)
-    end_time = time.time()
-    
-    # Verify the result is sorted
-    is_sorted = all(result[i] <= result[i+1] for i in range(len(result)-1))
+    times = []
+    for _ in range(max(1, repeats)):
+        # Create a copy to avoid modifying original
+        test_data = data.copy()
+        
+        start_time = time.perf_counter()
+        result = algorithm(test_data, show_progress=False)
+        times.append(time.perf_counter() - start_time)
     
     return {
         'algorithm': algorithm_name,
-        'time': end_time - start_time,
-        'is_sorted': is_sorted,
+        'time': statistics.median(times),
+        'times': times,
+        'is_sorted': is_sorted(result) and fingerprint(result) == fingerprint(data),
         'data_size': len(data)
     }
\ No newline at end of file
@@ -0,0 +1,177 @@
+# bench.py
+"""Offline micro-benchmarks of the sorting algorithms.
+
+Runs every algorithm over a grid of sizes and input distributions, timing
+repeated runs with perf_counter after warmups, and reports the median and
+interquartile range plus peak memory from tracemalloc. Results can be saved
+as JSON and compared against a saved baseline to flag regressions:
+
+    python bench.py --sizes 1000,100000 --output baseline.json
+    python bench.py --sizes 1000,100000 --baseline baseline.json
+"""
+import json
+import platform
+import statistics
+import sys
+import tracemalloc
+from datetime import datetime
+from algorithms import SIMPLE_ALGORITHMS, NUMPY_ALGORITHMS, benchmark_algorithm, get_sort_function, np
+import datasets
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000, 10000000]
+DEFAULT_DISTRIBUTIONS = ['uniform', 'sorted', 'reversed', 'few_unique', 'sawtooth']
+
+# O(n²) algorithms are skipped above this size, they would run for hours
+QUADRATIC_ALGORITHMS = {'bubblesort', 'insertionsort', 'selectionsort'}
+QUADRATIC_MAX_SIZE = 10000
+
+# A median this much slower than the baseline (and outside its IQR) is a regression
+REGRESSION_THRESHOLD = 0.10
+
+def make_data(distribution, size, seed):
+    """Reproducible input of the given distribution"""
+    return datasets.generate(distribution, size, seed).tolist()
+
+def peak_memory(algorithm_name, data):
+    """Peak bytes allocated while sorting a copy of data"""
+    sort_function = get_sort_function(algorithm_name)
+    test_data = data.copy()
+    tracemalloc.start()
+    try:
+        sort_function(test_data, show_progress=False)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def summarize(times):
+    """Median, interquartile range and extremes of a list of run times"""
+    if len(times) >= 2:
+        q1, _, q3 = statistics.quantiles(times, n=4, method='inclusive')
+    else:
+        q1 = q3 = times[0]
+    return {
+        'median': statistics.median(times),
+        'iqr': q3 - q1,
+        'min': min(times),
+        'max': max(times),
+        'times': times
+    }
+
+def run_benchmarks(algorithms, sizes, distributions, repeats, warmups, seed, measure_memory=True):
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            data = make_data(distribution, size, seed)
+            for algorithm_name in algorithms:
+                result = {'algorithm': algorithm_name, 'distribution': distribution, 'size': size}
+                if algorithm_name in QUADRATIC_ALGORITHMS and size > QUADRATIC_MAX_SIZE:
+                    result['skipped'] = f"O(n²) above {QUADRATIC_MAX_SIZE}"
+                    results.append(result)
+                    continue
+                
+                run = benchmark_algorithm(algorithm_name, data, repeats=repeats, warmups=warmups)
+                result.update(summarize(run['times']))
+                result['ok'] = run['is_sorted']
+                if measure_memory:
+                    result['peak_memory_bytes'] = peak_memory(algorithm_name, data)
+                results.append(result)
+                
+                memory = f" | peak {result['peak_memory_bytes'] / 1e6:.1f} MB" if measure_memory else ''
+                print(f"{algorithm_name:14} {distribution:10} {size:>9} | "
+                      f"median {result['median']:.4f}s ± {result['iqr']:.4f}{memory}"
+                      f"{'' if result['ok'] else ' | WRONG RESULT'}")
+    return results
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """Regressions and improvements of results against a baseline run"""
+    previous = {(r['algorithm'], r['distribution'], r['size']): r for r in baseline['results'] if 'median' in r}
+    regressions = []
+    improvements = []
+    for result in results:
+        before = previous.get((result['algorithm'], result['distribution'], result['size']))
+        if 'median' not in result or before is None:
+            continue
+        change = result['median'] / before['median'] - 1 if before['median'] > 0 else 0.0
+        # Differences within the baseline's own spread are noise
+        if abs(result['median'] - before['median']) <= before['iqr']:
+            continue
+        entry = dict(result, baseline_median=before['median'], change=change)
+        if change > threshold:
+            regressions.append(entry)
+        elif change < -threshold:
+            improvements.append(entry)
+    return regressions, improvements
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sorting algorithm micro-benchmarks')
+    parser.add_argument('--algorithms', help='Comma-separated algorithms (defaults to all)')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated input sizes')
+    parser.add_argument('--distributions', default=','.join(DEFAULT_DISTRIBUTIONS),
+                        help=f"Comma-separated input distributions out of {', '.join(datasets.DISTRIBUTIONS)}")
+    parser.add_argument('--repeats', type=int, default=5, help='Timed runs per case')
+    parser.add_argument('--warmups', type=int, default=1, help='Untimed runs per case')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated inputs')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc peak memory run')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against results saved with --output')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Relative slowdown that counts as a regression')
+    
+    args = parser.parse_args()
+    
+    available = list(SIMPLE_ALGORITHMS) + list(NUMPY_ALGORITHMS)
+    algorithms = args.algorithms.split(',') if args.algorithms else available
+    unknown = [name for name in algorithms if name not in available]
+    if unknown:
+        parser.error(f"Unknown algorithms: {', '.join(unknown)}")
+    distributions = args.distributions.split(',')
+    unknown = [name for name in distributions if name not in datasets.DISTRIBUTIONS]
+    if unknown:
+        parser.error(f"Unknown distributions: {', '.join(unknown)}")
+    sizes = [int(float(size)) for size in args.sizes.split(',')]
+    
+    results = run_benchmarks(algorithms, sizes, distributions, args.repeats, args.warmups,
+                             args.seed, measure_memory=not args.no_memory)
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python_version': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy_version': np.__version__ if np is not None else None,
+            'repeats': args.repeats,
+            'warmups': args.warmups,
+            'seed': args.seed
+        },
+        'results': results
+    }
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    
+    failed = [r for r in results if r.get('ok') is False]
+    if failed:
+        print(f"{len(failed)} case(s) produced a wrong result")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions, improvements = compare(results, baseline, args.threshold)
+        for entry in improvements:
+            print(f"Improved:  {entry['algorithm']} {entry['distribution']} {entry['size']}: "
+                  f"{entry['baseline_median']:.4f}s -> {entry['median']:.4f}s ({entry['change']:+.1%})")
+        for entry in regressions:
+            print(f"REGRESSED: {entry['algorithm']} {entry['distribution']} {entry['size']}: "
+                  f"{entry['baseline_median']:.4f}s -> {entry['median']:.4f}s ({entry['change']:+.1%})")
+        print(f"{len(regressions)} regression(s), {len(improvements)} improvement(s) against {args.baseline}")
+        if regressions:
+            sys.exit(1)
+    
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
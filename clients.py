@@ -6,22 +6,84 @@ import socket
 import os
 import sys
 import platform
-from algorithms import ALGORITHMS, SIMPLE_ALGORITHMS, get_algorithm_info
+import heapq
+import queue
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from algorithms import ALGORITHMS, NUMPY_ALGORITHMS, choose_algorithm, get_algorithm_info, get_sort_function, is_sorted
+import protocol
+
+# Chunks smaller than this per worker are sorted in-process
+MIN_PIECE_SIZE = 10000
+
+# Sort progress is forwarded to the master at most this often
+PROGRESS_REPORT_INTERVAL = 0.5
+
+# How long the master may hold a get-work request open before answering no_work
+LONG_POLL_SECONDS = 25
+
+# Results are streamed, so this only bounds stalls, not the whole upload
+SUBMIT_TIMEOUT = 60
+
+# The pipelined mode retries a failed submit this many times, doubling the
+# wait from SUBMIT_RETRY_BACKOFF seconds, before giving the chunk back
+SUBMIT_RETRIES = 3
+SUBMIT_RETRY_BACKOFF = 1
+
+# A heartbeat is only sent when nothing else reached the master for this long;
+# work polls, progress reports and submissions all count as a sign of life
+HEARTBEAT_INTERVAL = 3
+
+# Keep-alive connections shared by the work, heartbeat and progress threads
+HTTP_POOL_SIZE = 4
+
+def sort_shared_piece(shm_name, typecode, start_idx, end_idx, algorithm):
+    """Worker process: sort one slice of a shared-memory buffer in place"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        view = shm.buf.cast('B').cast(typecode)
+        sort_function = get_sort_function(algorithm)
+        if algorithm in NUMPY_ALGORITHMS:
+            # Sorted from the shared buffer and copied back as raw bytes
+            piece = sort_function(view[start_idx:end_idx])
+            view[start_idx:end_idx] = memoryview(piece).cast('B').cast(typecode)
+        else:
+            view[start_idx:end_idx] = array(typecode, sort_function(view[start_idx:end_idx].tolist()))
+        view.release()
+    finally:
+        shm.close()
 
 class Client:
-    def __init__(self, server_url, client_name=None):
+    def __init__(self, server_url, client_name=None, wire_format='binary', workers=1, pipeline=0):
         self.server_url = server_url
         self.client_id = client_name or f"{socket.gethostname()}_{os.getpid()}"
-        self.algorithms = list(ALGORITHMS.keys())
+        self.algorithms = list(get_algorithm_info().keys())
         self.running = True
         self.current_mode = None
         self.current_algorithm = None
+        self.wire_formats = [wire_format, 'json'] if wire_format != 'json' else ['json']
+        self.wire_format = 'json'
+        self.compression = 'none'
+        self.long_poll = False
+        self.workers = max(1, workers)
+        self.executor = ProcessPoolExecutor(self.workers) if self.workers > 1 else None
+        self.pipeline = max(0, pipeline)
+        self.pending_progress = None
+        self.session = requests.Session()
+        self.session.mount('http://', requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE))
+        self.last_contact = 0
+        self.polling = False
         
         print(f"Starting Client: {self.client_id}")
         print(f"Supported algorithms: {', '.join(self.algorithms)}")
+        if self.executor:
+            print(f"Local workers: {self.workers}")
         
         self.register()
         self.start_heartbeat()
+        self.start_progress_reporter()
     
     def get_system_info(self):
         """Get client system information (Windows compatible)"""
@@ -32,7 +94,9 @@ class Client:
                 'hostname': socket.gethostname(),
                 'processor': platform.processor(),
                 'architecture': platform.architecture()[0],
-                'python_version': platform.python_version()
+                'python_version': platform.python_version(),
+                'cpu_cores': os.cpu_count(),
+                'workers': self.workers
             }
             
             # Try to get Windows-specific info
@@ -60,124 +124,351 @@ class Client:
     def register(self):
         """Register with master server"""
         try:
-            response = requests.post(f"{self.server_url}/api/register", json={
+            response = self.session.post(f"{self.server_url}/api/register", json={
                 'client_id': self.client_id,
                 'capabilities': ['serial', 'parallel'],
                 'algorithms': self.algorithms,
                 'algorithm_info': get_algorithm_info(),
                 'hostname': socket.gethostname(),
-                'system_info': self.get_system_info()
+                'system_info': self.get_system_info(),
+                'wire_formats': self.wire_formats,
+                'compression': protocol.available_compressions()
             }, timeout=5)
-            print(f"Registered with master: {response.json()}")
+            result = response.json()
+            self.last_contact = time.time()
+            # Older masters don't negotiate and only speak JSON
+            self.wire_format = result.get('wire_format', 'json')
+            self.compression = result.get('compression', 'none')
+            self.long_poll = result.get('long_poll', False)
+            print(f"Registered with master: {result}")
         except Exception as e:
             print(f"Registration failed: {e}")
     
     def start_heartbeat(self):
-        """Send heartbeat every 3 seconds"""
+        """Send a heartbeat when the master hasn't heard from us for HEARTBEAT_INTERVAL"""
         def heartbeat_loop():
             while self.running:
-                try:
-                    response = requests.post(f"{self.server_url}/api/heartbeat", 
-                                           json={'client_id': self.client_id},
-                                           timeout=5)
-                    if response.status_code == 200:
-                        status = f"Mode: {self.current_mode or 'idle'}"
-                        if self.current_algorithm:
-                            status += f" | Algorithm: {self.current_algorithm}"
-                        print(f"Heartbeat - {status}")
-                except Exception as e:
-                    print(f"Heartbeat error: {e}")
-                    self.register()
+                # A parked long poll keeps us alive on the master by itself
+                if not self.polling and time.time() - self.last_contact >= HEARTBEAT_INTERVAL:
+                    try:
+                        response = self.session.post(f"{self.server_url}/api/heartbeat", 
+                                                     json={'client_id': self.client_id},
+                                                     timeout=5)
+                        if response.json().get('status') == 'not_found':
+                            # The master dropped us (or restarted), join again
+                            self.register()
+                        else:
+                            self.last_contact = time.time()
+                            status = f"Mode: {self.current_mode or 'idle'}"
+                            if self.current_algorithm:
+                                status += f" | Algorithm: {self.current_algorithm}"
+                            print(f"Heartbeat - {status}")
+                    except Exception as e:
+                        print(f"Heartbeat error: {e}")
+                        self.register()
                 
-                time.sleep(3)
+                time.sleep(1)
         
         threading.Thread(target=heartbeat_loop, daemon=True).start()
     
+    def start_progress_reporter(self):
+        """Forward the latest sort progress to the master in the background"""
+        def progress_loop():
+            while self.running:
+                update = self.pending_progress
+                if update is not None:
+                    self.pending_progress = None
+                    try:
+                        self.session.post(f"{self.server_url}/api/report-progress", json=update, timeout=5)
+                        self.last_contact = time.time()
+                    except Exception as e:
+                        print(f"Progress report error: {e}")
+                
+                time.sleep(PROGRESS_REPORT_INTERVAL)
+        
+        threading.Thread(target=progress_loop, daemon=True).start()
+    
+    def progress_callback(self, batch_id, chunk_id, size):
+        """Progress callback for a chunk; only keeps the latest update for the reporter thread"""
+        start_time = time.time()
+        
+        def on_progress(percent, detail):
+            elements = int(size * percent / 100)
+            elapsed = time.time() - start_time
+            self.pending_progress = {
+                'client_id': self.client_id,
+                'batch_id': batch_id,
+                'chunk_id': chunk_id,
+                'percent': percent,
+                'detail': detail,
+                'elements': elements,
+                'throughput': elements / elapsed if elapsed > 0 else None
+            }
+        return on_progress
+    
+    def sort_parallel(self, data, algorithm, on_progress=None):
+        """Sort a chunk across the local process pool and merge the pieces"""
+        typecode = 'q'
+        numbers = array(typecode, data)
+        shm = shared_memory.SharedMemory(create=True, size=len(numbers) * numbers.itemsize)
+        try:
+            view = shm.buf.cast('B').cast(typecode)
+            view[:] = numbers
+            
+            piece_size = -(-len(numbers) // self.workers)
+            bounds = [(start, min(start + piece_size, len(numbers)))
+                      for start in range(0, len(numbers), piece_size)]
+            futures = [self.executor.submit(sort_shared_piece, shm.name, typecode, start, end, algorithm)
+                       for start, end in bounds]
+            for done, future in enumerate(as_completed(futures), start=1):
+                future.result()
+                if on_progress:
+                    on_progress((done / len(futures)) * 100, f"Pieces sorted: {done}/{len(futures)}")
+            
+            sorted_data = list(heapq.merge(*(view[start:end] for start, end in bounds)))
+            view.release()
+            return sorted_data
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def sort_chunk(self, data, algorithm, on_progress=None):
+        """Sort a chunk with the requested algorithm, using local workers for big chunks"""
+        if self.executor and len(data) >= self.workers * MIN_PIECE_SIZE:
+            print(f"Splitting chunk across {self.workers} local workers")
+            return self.sort_parallel(data, algorithm, on_progress)
+        
+        # NumPy reads binary chunks straight from their buffer
+        if algorithm in NUMPY_ALGORITHMS:
+            sort_function, _ = NUMPY_ALGORITHMS[algorithm]
+            return sort_function(data, show_progress=True)
+        
+        # The pure-Python algorithms sort a list in place
+        working = data.tolist() if isinstance(data, array) else data.copy()
+        
+        # Choose the appropriate sorting function
+        if algorithm in ALGORITHMS:
+            sort_function, _ = ALGORITHMS[algorithm]
+            return sort_function(working, on_progress=on_progress)
+        
+        # Fallback to simple version
+        print(f"Using simple {algorithm} (no progress display)")
+        return get_sort_function(algorithm)(working, show_progress=False)
+    
+    def fetch_work(self, prefetch=False):
+        """Ask the master for a chunk; binary chunks are decoded as they stream in.
+
+        With prefetch, the master skips chunks this client was already sent.
+        """
+        params = {'wait': LONG_POLL_SECONDS} if self.long_poll else {}
+        if prefetch:
+            params['prefetch'] = 1
+        timeout = LONG_POLL_SECONDS + 10 if self.long_poll else 10
+        self.polling = self.long_poll
+        try:
+            with self.session.get(f"{self.server_url}/api/get-work/{self.client_id}",
+                                  params=params, timeout=timeout, stream=True) as response:
+                self.last_contact = time.time()
+                if response.headers.get('Content-Type', '').startswith(protocol.BINARY_CONTENT_TYPE):
+                    batch_id, chunk_id, numbers, meta = protocol.read_chunk(response.raw)
+                    # Kept as the decoded array; sort_chunk makes the one working copy
+                    return dict(meta, batch_id=batch_id, chunk_id=chunk_id, data=numbers)
+                return response.json()
+        finally:
+            self.polling = False
+    
+    def handle_no_work(self, retry_after=None):
+        if self.current_mode != 'idle':
+            print("No work available, waiting...")
+            self.current_mode = 'idle'
+            self.current_algorithm = None
+        # A long poll already waited on the master, ask again straight away,
+        # unless the master was too busy to park it
+        if retry_after:
+            time.sleep(retry_after)
+        elif not self.long_poll:
+            time.sleep(5)
+    
+    def handle_error(self, e):
+        """Log a failed step and back off before the next one"""
+        if isinstance(e, requests.exceptions.Timeout):
+            print("Request timeout")
+        elif isinstance(e, requests.exceptions.ConnectionError):
+            print("Connection error, retrying in 10s...")
+            time.sleep(10)
+        else:
+            print(f"Error: {e}")
+            time.sleep(5)
+    
+    def run_work(self, work):
+        """Sort an assigned chunk; returns what submit_result needs"""
+        data = work['data']
+        algorithm = work['algorithm']
+        batch_id = work['batch_id']
+        chunk_id = work.get('chunk_id', 0)
+        mode = work.get('mode', 'unknown')
+        
+        if mode != self.current_mode or algorithm != self.current_algorithm:
+            self.current_mode = mode
+            self.current_algorithm = algorithm
+            print(f"Mode changed to: {mode.upper()} | Algorithm: {algorithm}")
+        
+        print(f"Starting {mode} work")
+        print(f"Chunk {chunk_id} | {len(data)} numbers | Algorithm: {algorithm}")
+        print(f"Data range: {min(data)} to {max(data)}")
+        
+        # Record start time
+        work_start_time = time.time()
+        
+        # auto is resolved here, so local workers all use the same choice and it can be reported
+        decision = None
+        if algorithm == 'auto':
+            decision = choose_algorithm(data)
+            algorithm = decision['algorithm']
+            print(f"Auto picked {algorithm}: {decision['reason']}")
+        
+        sorted_data = self.sort_chunk(data, algorithm, self.progress_callback(batch_id, chunk_id, len(data)))
+        
+        processing_time = time.time() - work_start_time
+        
+        print(f"Chunk {chunk_id} completed in {processing_time:.3f}s")
+        print(f"Result: {len(sorted_data)} numbers | Sorted: {is_sorted(sorted_data)}")
+        print(f"First 5: {sorted_data[:5]}... Last 5: {sorted_data[-5:]}")
+        
+        return batch_id, chunk_id, sorted_data, processing_time, decision
+    
+    def submit_result(self, batch_id, chunk_id, sorted_data, processing_time, decision=None):
+        """Send a sorted chunk back; binary results are encoded block by block while they upload"""
+        if self.wire_format == 'binary':
+            body = protocol.iter_chunk(batch_id, chunk_id, sorted_data, meta={
+                'client_id': self.client_id,
+                'processing_time': processing_time,
+                'auto_decision': decision
+            }, compression=self.compression)
+            submit_response = self.session.post(f"{self.server_url}/api/submit-work", data=body,
+                                                headers={'Content-Type': protocol.BINARY_CONTENT_TYPE},
+                                                timeout=SUBMIT_TIMEOUT)
+        else:
+            submit_response = self.session.post(f"{self.server_url}/api/submit-work", json={
+                'batch_id': batch_id,
+                'client_id': self.client_id,
+                'processed_data': sorted_data if isinstance(sorted_data, list) else sorted_data.tolist(),
+                'processing_time': processing_time,
+                'chunk_id': chunk_id,
+                'auto_decision': decision
+            }, timeout=SUBMIT_TIMEOUT)
+        
+        self.last_contact = time.time()
+        if submit_response.status_code == 200:
+            print(f"Chunk {chunk_id} result submitted successfully!")
+            return True
+        else:
+            print(f"Chunk {chunk_id} submit failed")
+            return False
+    
+    def release_work(self, batch_id, chunk_id):
+        """Give a chunk back to the master so it is handed out again"""
+        try:
+            self.session.post(f"{self.server_url}/api/release-work", json={
+                'client_id': self.client_id,
+                'batch_id': batch_id,
+                'chunk_id': chunk_id
+            }, timeout=10)
+            print(f"Chunk {chunk_id} released back to the master")
+        except Exception as e:
+            print(f"Could not release chunk {chunk_id}: {e}")
+    
     def process_work(self):
         """Main work loop with enhanced progress visualization"""
+        if self.pipeline:
+            return self.process_work_pipelined()
+        
         print("Starting work processor...")
         
         while self.running:
             try:
-                response = requests.get(f"{self.server_url}/api/get-work/{self.client_id}", timeout=10)
-                work = response.json()
+                work = self.fetch_work()
                 
                 if work.get('status') == 'no_work':
-                    if self.current_mode != 'idle':
-                        print("No work available, waiting...")
-                        self.current_mode = 'idle'
-                        self.current_algorithm = None
-                    time.sleep(5)
+                    self.handle_no_work(work.get('retry_after'))
                     continue
                 
-                # Process the assigned work
-                data = work['data']
-                algorithm = work['algorithm']
-                batch_id = work['batch_id']
-                chunk_id = work.get('chunk_id', 0)
-                mode = work.get('mode', 'unknown')
-                
-                if mode != self.current_mode or algorithm != self.current_algorithm:
-                    self.current_mode = mode
-                    self.current_algorithm = algorithm
-                    print(f"Mode changed to: {mode.upper()} | Algorithm: {algorithm}")
+                self.submit_result(*self.run_work(work))
                 
-                print(f"Starting {mode} work")
-                print(f"Chunk {chunk_id} | {len(data)} numbers | Algorithm: {algorithm}")
-                print(f"Data range: {min(data)} to {max(data)}")
-                
-                # Record start time
-                work_start_time = time.time()
-                
-                # Choose the appropriate sorting function
-                if algorithm in ALGORITHMS:
-                    sort_function, _ = ALGORITHMS[algorithm]
-                    sorted_data = sort_function(data.copy())
-                else:
-                    # Fallback to simple version
-                    sorted_data = SIMPLE_ALGORITHMS.get(algorithm, SIMPLE_ALGORITHMS['quicksort'])(data.copy(), show_progress=False)
-                    print(f"Using simple {algorithm} (no progress display)")
-                
-                processing_time = time.time() - work_start_time
-                
-                # Verify sort
-                is_sorted = all(sorted_data[i] <= sorted_data[i+1] for i in range(len(sorted_data)-1))
-                status = "SUCCESS" if is_sorted else "FAILED"
-                
-                print(f"Chunk {chunk_id} completed in {processing_time:.3f}s")
-                print(f"Result: {len(sorted_data)} numbers | Sorted: {is_sorted}")
-                print(f"First 5: {sorted_data[:5]}... Last 5: {sorted_data[-5:]}")
-                
-                # Submit result
-                submit_response = requests.post(f"{self.server_url}/api/submit-work", json={
-                    'batch_id': batch_id,
-                    'client_id': self.client_id,
-                    'processed_data': sorted_data,
-                    'processing_time': processing_time,
-                    'chunk_id': chunk_id
-                }, timeout=10)
-                
-                if submit_response.status_code == 200:
-                    print("Result submitted successfully!")
-                else:
-                    print("Submit failed")
-                
-            except requests.exceptions.Timeout:
-                print("Request timeout")
-            except requests.exceptions.ConnectionError:
-                print("Connection error, retrying in 10s...")
-                time.sleep(10)
             except KeyboardInterrupt:
                 print("Client stopping...")
                 self.stop()
                 break
             except Exception as e:
-                print(f"Error: {e}")
-                time.sleep(5)
+                self.handle_error(e)
+    
+    def process_work_pipelined(self):
+        """Work loop that overlaps fetching, sorting and submitting.
+
+        A fetch thread keeps up to `pipeline` chunks queued ahead of the one
+        being sorted and a submit thread uploads finished chunks, so network
+        time hides behind sorting when the master hands out several chunks.
+        """
+        print(f"Starting pipelined work processor (prefetching up to {self.pipeline} chunks)...")
+        work_queue = queue.Queue(maxsize=self.pipeline)
+        results = queue.Queue(maxsize=self.pipeline)
+        
+        def fetch_loop():
+            while self.running:
+                try:
+                    work = self.fetch_work(prefetch=True)
+                except Exception as e:
+                    self.handle_error(e)
+                    continue
+                if work.get('status') == 'no_work':
+                    if work.get('retry_after'):
+                        time.sleep(work['retry_after'])
+                    elif not self.long_poll:
+                        time.sleep(1)
+                    continue
+                work_queue.put(work)
+        
+        def submit_loop():
+            while self.running:
+                result = results.get()
+                for attempt in range(SUBMIT_RETRIES):
+                    try:
+                        if self.submit_result(*result):
+                            break
+                    except Exception as e:
+                        print(f"Chunk {result[1]} submit error: {e}")
+                    time.sleep(SUBMIT_RETRY_BACKOFF * 2 ** attempt)
+                else:
+                    self.release_work(result[0], result[1])
+        
+        threading.Thread(target=fetch_loop, daemon=True).start()
+        threading.Thread(target=submit_loop, daemon=True).start()
+        
+        try:
+            while self.running:
+                try:
+                    work = work_queue.get(timeout=1)
+                except queue.Empty:
+                    if work_queue.empty() and results.empty() and self.current_mode not in (None, 'idle'):
+                        print("No work available, waiting...")
+                        self.current_mode = 'idle'
+                        self.current_algorithm = None
+                    continue
+                try:
+                    results.put(self.run_work(work))
+                except Exception as e:
+                    print(f"Error: {e}")
+                    self.release_work(work['batch_id'], work.get('chunk_id', 0))
+        except KeyboardInterrupt:
+            print("Client stopping...")
+            self.stop()
     
     def stop(self):
         """Stop the client"""
         self.running = False
+        self.session.close()
+        if self.executor:
+            self.executor.shutdown(cancel_futures=True)
         print("Client stopped")
 
 def main():
@@ -186,10 +477,16 @@ def main():
     parser = argparse.ArgumentParser(description='Sorting Client')
     parser.add_argument('--server', default='http://localhost:5000', help='Master server URL')
     parser.add_argument('--name', help='Custom client name')
+    parser.add_argument('--wire-format', choices=protocol.WIRE_FORMATS, default='binary',
+                        help='Preferred chunk encoding (JSON is always kept as fallback)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Local processes to sort each chunk with (defaults to 1)')
+    parser.add_argument('--pipeline', type=int, default=0,
+                        help='Chunks to prefetch while sorting, with results submitted in the background (0 = sequential)')
     
     args = parser.parse_args()
     
-    client = Client(args.server, args.name)
+    client = Client(args.server, args.name, args.wire_format, args.workers, args.pipeline)
     
     try:
         client.process_work()
@@ -0,0 +1,175 @@
+# datasets.py
+"""Reproducible workload generation.
+
+Datasets are produced block by block from a seed, so a batch of any size can
+be written straight into the store without ever being held in memory, and
+the same (distribution, count, seed, parameters) always gives the same numbers.
+"""
+import random
+from array import array
+
+# NumPy is optional; without it generation falls back to the random module
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DISTRIBUTIONS = ['uniform', 'normal', 'zipf', 'sorted', 'reversed', 'nearly_sorted', 'few_unique', 'sawtooth']
+
+# Numbers generated per block; part of the definition of a seeded dataset
+GENERATE_BLOCK_SIZE = 1 << 20
+
+DEFAULT_LOW = 1
+DEFAULT_HIGH = 1000000
+ZIPF_EXPONENT = 1.5
+FEW_UNIQUE_VALUES = 10
+# Sorted datasets keep one counter per possible value
+MAX_SORTED_SPAN = 1 << 24
+
+def new_seed():
+    """A fresh seed, for callers that want a random dataset they can replay later"""
+    return random.randrange(2 ** 32)
+
+def default_swaps(count):
+    """Disjoint swaps that make a nearly sorted dataset: about 1% of the numbers"""
+    return max(1, count // 100)
+
+def value_range(typecode):
+    """Smallest and largest value an array of typecode can hold"""
+    bits = 8 * array(typecode).itemsize
+    if typecode in 'bhilq':
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    return 0, (1 << bits) - 1
+
+def _block_sizes(count):
+    for start in range(0, count, GENERATE_BLOCK_SIZE):
+        yield start, min(GENERATE_BLOCK_SIZE, count - start)
+
+def _sorted_positions(rng, count, low, high):
+    """Value histogram of `count` uniform numbers and its cumulative counts.
+
+    A sorted uniform dataset is fully described by how often each value
+    occurs, so it can be emitted block by block without sorting anything.
+    """
+    counts = rng.multinomial(count, np.full(high - low + 1, 1 / (high - low + 1)))
+    return np.cumsum(counts)
+
+def _sorted_block(ends, low, start, size, descending):
+    """Numbers start..start+size of the sorted (or reversed) dataset described by ends"""
+    positions = np.arange(start, start + size)
+    if descending:
+        positions = ends[-1] - 1 - positions
+    return low + np.searchsorted(ends, positions, side='right')
+
+def _numpy_blocks(distribution, count, seed, low, high, swaps, unique):
+    rng = np.random.default_rng(seed)
+
+    if distribution in ('sorted', 'reversed', 'nearly_sorted'):
+        ends = _sorted_positions(rng, count, low, high)
+        descending = distribution == 'reversed'
+        positions = replacements = np.zeros(0, dtype=np.int64)
+        if distribution == 'nearly_sorted' and count > 1:
+            # k disjoint swaps; the values at both ends are known up front from the histogram
+            chosen = rng.choice(count, size=2 * min(swaps, count // 2), replace=False)
+            values = low + np.searchsorted(ends, chosen, side='right')
+            values = values.reshape(-1, 2)[:, ::-1].ravel()
+            order = np.argsort(chosen)
+            positions, replacements = chosen[order], values[order]
+        for start, size in _block_sizes(count):
+            block = _sorted_block(ends, low, start, size, descending)
+            first, last = np.searchsorted(positions, [start, start + size])
+            block[positions[first:last] - start] = replacements[first:last]
+            yield block
+        return
+
+    if distribution == 'few_unique':
+        values = rng.integers(low, high + 1, size=unique)
+
+    for start, size in _block_sizes(count):
+        if distribution == 'uniform':
+            block = rng.integers(low, high + 1, size=size)
+        elif distribution == 'normal':
+            block = np.rint(rng.normal((low + high) / 2, (high - low) / 6, size=size))
+        elif distribution == 'zipf':
+            block = low - 1 + rng.zipf(ZIPF_EXPONENT, size=size)
+        elif distribution == 'few_unique':
+            block = values[rng.integers(0, unique, size=size)]
+        else:
+            # Ascending runs of about sqrt(count) numbers each
+            period = max(1, int(count ** 0.5))
+            block = low + np.arange(start, start + size) % period
+        yield np.clip(block, low, high)
+
+def _python_blocks(distribution, count, seed, low, high, swaps, unique):
+    rng = random.Random(seed)
+
+    if distribution in ('sorted', 'reversed', 'nearly_sorted'):
+        # Without NumPy the histogram trick is too slow; build it in memory
+        numbers = sorted((rng.randint(low, high) for _ in range(count)), reverse=distribution == 'reversed')
+        if distribution == 'nearly_sorted' and count > 1:
+            chosen = rng.sample(range(count), 2 * min(swaps, count // 2))
+            for i, j in zip(chosen[::2], chosen[1::2]):
+                numbers[i], numbers[j] = numbers[j], numbers[i]
+        for start, size in _block_sizes(count):
+            yield numbers[start:start + size]
+        return
+
+    values = [rng.randint(low, high) for _ in range(unique)]
+    period = max(1, int(count ** 0.5))
+    for start, size in _block_sizes(count):
+        if distribution == 'uniform':
+            block = [rng.randint(low, high) for _ in range(size)]
+        elif distribution == 'normal':
+            block = [round(rng.gauss((low + high) / 2, (high - low) / 6)) for _ in range(size)]
+        elif distribution == 'zipf':
+            # Discrete power law, close to NumPy's zipf
+            block = [low - 1 + int(rng.paretovariate(ZIPF_EXPONENT - 1)) for _ in range(size)]
+        elif distribution == 'few_unique':
+            block = [rng.choice(values) for _ in range(size)]
+        else:
+            block = [low + i % period for i in range(start, start + size)]
+        yield [min(max(value, low), high) for value in block]
+
+def _numpy_array(block, typecode):
+    numbers = array(typecode)
+    numbers.frombytes(memoryview(block.astype(typecode)).cast('B'))
+    return numbers
+
+def generate_blocks(distribution, count, seed, low=DEFAULT_LOW, high=DEFAULT_HIGH,
+                    swaps=None, unique=FEW_UNIQUE_VALUES, typecode='i'):
+    """Return an iterator over the dataset as arrays of at most GENERATE_BLOCK_SIZE numbers.
+
+    The parameters are checked up front, so a bad one raises ValueError here
+    rather than once the blocks are consumed. NumPy and the pure-Python
+    fallback produce different (but each reproducible) numbers for the same seed.
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    if count < 0:
+        raise ValueError("count must not be negative")
+    if seed < 0:
+        raise ValueError("seed must not be negative")
+    if low > high:
+        raise ValueError("low must not be greater than high")
+    smallest, largest = value_range(typecode)
+    if low < smallest or high > largest:
+        raise ValueError(f"low and high must lie within {smallest}..{largest} for typecode '{typecode}'")
+    if swaps is not None and swaps < 0:
+        raise ValueError("swaps must not be negative")
+    if unique < 1:
+        raise ValueError("unique must be at least 1")
+    swaps = default_swaps(count) if swaps is None else swaps
+
+    if np is None:
+        return (array(typecode, block) for block in _python_blocks(distribution, count, seed, low, high, swaps, unique))
+    if distribution in ('sorted', 'reversed', 'nearly_sorted') and high - low >= MAX_SORTED_SPAN:
+        raise ValueError(f"Sorted distributions support value ranges up to {MAX_SORTED_SPAN}")
+    return (_numpy_array(block, typecode)
+            for block in _numpy_blocks(distribution, count, seed, low, high, swaps, unique))
+
+def generate(distribution, count, seed, **params):
+    """The whole dataset as one array"""
+    numbers = array(params.get('typecode', 'i'))
+    for block in generate_blocks(distribution, count, seed, **params):
+        numbers.extend(block)
+    return numbers
@@ -0,0 +1,315 @@
+# experiments.py
+"""Scaling experiments against a live master.
+
+Sweeps algorithms x parallel modes x data sizes x client counts: every size
+is generated once (seeded), sorted serially on one client as the baseline and
+then in parallel on 1, 2, 4, ... clients, waiting for each run to finish.
+Reports speedup and parallel efficiency per run, an Amdahl fit and the
+client count after which adding clients stops paying off. --weak-scaling
+adds a pass where the size grows with the clients (size x p on p clients),
+which is what the Gustafson fit is made on:
+
+    python experiments.py --server http://localhost:5000 --algorithms quicksort,np_radix \\
+        --modes index,range --sizes 100000,1000000 --clients 1,2,4 --output scaling.json
+
+Clients already connected to the master are used; --spawn starts local ones
+for the duration of the sweep.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+import requests
+import datasets
+
+MODES = ['index', 'range', 'external']
+DEFAULT_MODES = ['index', 'range']
+DEFAULT_SIZES = [100000, 1000000]
+DEFAULT_CLIENT_COUNTS = [1, 2, 4]
+
+POLL_INTERVAL = 0.2
+RUN_TIMEOUT = 3600
+CLIENT_WAIT_TIMEOUT = 30
+
+# Adding clients pays off while each extra client still adds this much speedup
+MIN_MARGINAL_SPEEDUP = 0.1
+
+def post(session, server, path, payload):
+    """POST to the master, raising RuntimeError for error replies"""
+    response = session.post(f"{server}{path}", json=payload, timeout=RUN_TIMEOUT)
+    result = response.json()
+    if response.status_code >= 400 or result.get('status') == 'error':
+        raise RuntimeError(result.get('message', f"{path} failed with HTTP {response.status_code}"))
+    return result
+
+def wait_for_clients(session, server, count, algorithm, timeout=CLIENT_WAIT_TIMEOUT):
+    """Wait until count idle clients support algorithm; returns how many are idle"""
+    deadline = time.time() + timeout
+    while True:
+        clients = session.get(f"{server}/api/clients", timeout=10).json()['clients']
+        idle = [client for client in clients.values()
+                if client['status'] == 'idle' and algorithm in client.get('algorithms', [])]
+        if len(idle) >= count or time.time() > deadline:
+            return len(idle)
+        time.sleep(POLL_INTERVAL)
+
+def wait_for_batch(session, server, batch_id, timeout=RUN_TIMEOUT):
+    """Poll a batch's progress until its sorted result is stored or the master gives it up"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        progress = session.get(f"{server}/api/progress/{batch_id}", timeout=10).json()
+        if progress.get('failed'):
+            raise RuntimeError(f"{batch_id} failed: {progress['failed']}")
+        if progress.get('is_complete') and 'total_time' in progress:
+            return progress
+        time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"{batch_id} did not finish within {timeout}s")
+
+def run_once(session, server, batch_id, algorithm, mode, clients, run_size=None, timeout=RUN_TIMEOUT):
+    """Sort a batch once and return the master's wall-clock time for it"""
+    if mode == 'serial':
+        post(session, server, '/api/start-serial', {'batch_id': batch_id, 'algorithm': algorithm})
+    else:
+        payload = {'batch_id': batch_id, 'algorithm': algorithm, 'distribution': mode, 'max_clients': clients}
+        if run_size:
+            payload['run_size'] = run_size
+        post(session, server, '/api/start-parallel', payload)
+    return wait_for_batch(session, server, batch_id, timeout)['total_time']
+
+def fit_amdahl(points):
+    """Parallel fraction f of S(p) = 1 / ((1 - f) + f / p), by least squares.
+
+    1 - 1/S = f * (1 - 1/p) is linear in f. Returns None without a p > 1.
+    """
+    xs = [1 - 1 / clients for clients, _ in points]
+    ys = [1 - 1 / speedup for _, speedup in points]
+    denominator = sum(x * x for x in xs)
+    if denominator == 0:
+        return None
+    return min(1.0, max(0.0, sum(x * y for x, y in zip(xs, ys)) / denominator))
+
+def fit_gustafson(points):
+    """Serial fraction s of S(p) = p - s * (p - 1), by least squares"""
+    denominator = sum((clients - 1) ** 2 for clients, _ in points)
+    if denominator == 0:
+        return None
+    numerator = sum((clients - 1) * (clients - speedup) for clients, speedup in points)
+    return min(1.0, max(0.0, numerator / denominator))
+
+def find_knee(points, min_gain=MIN_MARGINAL_SPEEDUP):
+    """The client count after which each extra client adds less than min_gain speedup"""
+    points = sorted(points)
+    for (clients, speedup), (more_clients, more_speedup) in zip(points, points[1:]):
+        if (more_speedup - speedup) / (more_clients - clients) < min_gain:
+            return clients
+    return points[-1][0] if points else None
+
+def analyze(runs):
+    """Add speedup and efficiency to the runs and fit each scaling curve.
+
+    speedup is against the serial run of the same algorithm and size. Strong
+    scaling curves (fixed size) get an Amdahl fit on the speedup against the
+    same mode on one client where that was measured, so chunking and merge
+    overhead count as serial work instead of skewing S(1) away from 1. Weak
+    scaling curves (size grown with the clients) get a Gustafson fit on
+    their scaled speedup.
+    """
+    serial = {(run['algorithm'], run['size']): run['median'] for run in runs
+              if run['mode'] == 'serial' and 'median' in run}
+    single = {(run['algorithm'], run['mode'], run['size']): run['median'] for run in runs
+              if run['scaling'] == 'strong' and run['clients'] == 1 and 'median' in run}
+    strong = {}
+    weak = {}
+    for run in runs:
+        baseline = serial.get((run['algorithm'], run['size']))
+        if run['mode'] == 'serial' or 'median' not in run or not baseline:
+            continue
+        run['speedup'] = baseline / run['median']
+        run['efficiency'] = run['speedup'] / run['clients']
+        if run['scaling'] == 'weak':
+            weak.setdefault((run['algorithm'], run['mode'], run['base_size']), []).append((run['clients'], run['speedup']))
+            continue
+        key = (run['algorithm'], run['mode'], run['size'])
+        run['relative_speedup'] = single.get(key, baseline) / run['median']
+        strong.setdefault(key, []).append((run['clients'], run['relative_speedup']))
+
+    fits = []
+    for (algorithm, mode, size), points in strong.items():
+        parallel_fraction = fit_amdahl(points)
+        best_clients, best_speedup = max(points, key=lambda point: point[1])
+        fits.append({
+            'scaling': 'strong',
+            'algorithm': algorithm,
+            'mode': mode,
+            'size': size,
+            'best_clients': best_clients,
+            'best_speedup': best_speedup,
+            'knee_clients': find_knee(points),
+            'amdahl_parallel_fraction': parallel_fraction,
+            # Speedup limit with unlimited clients
+            'amdahl_max_speedup': (1 / (1 - parallel_fraction) if parallel_fraction is not None and parallel_fraction < 1
+                                   else None)
+        })
+    for (algorithm, mode, base_size), points in weak.items():
+        best_clients, best_speedup = max(points, key=lambda point: point[1])
+        fits.append({
+            'scaling': 'weak',
+            'algorithm': algorithm,
+            'mode': mode,
+            'base_size': base_size,
+            'best_clients': best_clients,
+            'best_speedup': best_speedup,
+            'gustafson_serial_fraction': fit_gustafson(points)
+        })
+    return fits
+
+def timed_runs(session, server, batch_id, algorithm, mode, clients, repeats, run_size):
+    times = [run_once(session, server, batch_id, algorithm, mode, clients, run_size) for _ in range(repeats)]
+    return {'median': statistics.median(times), 'times': times}
+
+def measure(session, server, run, repeats, run_size):
+    """Time one case of the sweep; skipped when too few clients are idle"""
+    available = wait_for_clients(session, server, run['clients'], run['algorithm'])
+    label = f"{run['algorithm']:14} {run['mode']:8} {run['size']:>9} {run['clients']:>3} clients ({run['scaling']})"
+    if available < run['clients']:
+        run['skipped'] = f"only {available} idle client(s) support {run['algorithm']}"
+        print(f"{label} | skipped: {run['skipped']}")
+        return run
+
+    run.update(timed_runs(session, server, run['batch_id'], run['algorithm'], run['mode'], run['clients'],
+                          repeats, run_size))
+    print(f"{label} | median {run['median']:.3f}s")
+    return run
+
+def sweep_batch(session, server, runs, size, cases, algorithms, repeats, distribution, seed, run_size, **fields):
+    """Generate one batch of size and time every (mode, clients) case on it"""
+    batch_id = post(session, server, '/api/generate',
+                    {'count': size, 'distribution': distribution, 'seed': seed})['batch_id']
+    for algorithm in algorithms:
+        for mode, clients in cases:
+            run = dict(fields, algorithm=algorithm, mode=mode, size=size, clients=clients, batch_id=batch_id)
+            runs.append(measure(session, server, run, repeats, run_size))
+
+def run_experiments(server, algorithms, modes, sizes, client_counts, repeats=3,
+                    distribution='uniform', seed=0, run_size=None, weak_scaling=False, session=None):
+    """Run the whole sweep and return (runs, fits).
+
+    Every size is sorted serially and by each mode on every client count.
+    With weak_scaling the sizes are also used per client: p clients sort a
+    batch of size * p, against a serial run of that same batch.
+    """
+    session = session or requests.Session()
+    runs = []
+    for size in sizes:
+        cases = [('serial', 1)] + [(mode, clients) for mode in modes for clients in client_counts]
+        sweep_batch(session, server, runs, size, cases, algorithms, repeats, distribution, seed, run_size,
+                    scaling='strong')
+    if weak_scaling:
+        for base_size in sizes:
+            for clients in client_counts:
+                cases = [('serial', 1)] + [(mode, clients) for mode in modes]
+                sweep_batch(session, server, runs, base_size * clients, cases, algorithms, repeats,
+                            distribution, seed, run_size, scaling='weak', base_size=base_size)
+    return runs, analyze(runs)
+
+def spawn_clients(server, count):
+    """Start count local clients.py processes connected to server"""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'clients.py')
+    return [subprocess.Popen([sys.executable, script, '--server', server, '--name', f"experiment_{i + 1}"],
+                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for i in range(count)]
+
+def print_report(runs, fits):
+    print("\nStrong scaling (speedup against the serial run, relative speedup against the mode on one client):")
+    for run in runs:
+        if 'relative_speedup' in run:
+            print(f"{run['algorithm']:14} {run['mode']:8} {run['size']:>9} {run['clients']:>3} clients | "
+                  f"{run['median']:.3f}s | speedup {run['speedup']:.2f}x | efficiency {run['efficiency']:.0%} | "
+                  f"relative {run['relative_speedup']:.2f}x")
+    if any(run['scaling'] == 'weak' and 'speedup' in run for run in runs):
+        print("\nWeak scaling (scaled speedup against the serial run of the same, grown batch):")
+    for run in runs:
+        if run['scaling'] == 'weak' and 'speedup' in run:
+            print(f"{run['algorithm']:14} {run['mode']:8} {run['size']:>9} {run['clients']:>3} clients | "
+                  f"{run['median']:.3f}s | scaled speedup {run['speedup']:.2f}x | efficiency {run['efficiency']:.0%}")
+    print()
+    for fit in fits:
+        if fit['scaling'] == 'weak':
+            line = (f"{fit['algorithm']} {fit['mode']} {fit['base_size']} per client: best scaled "
+                    f"{fit['best_speedup']:.2f}x on {fit['best_clients']} client(s)")
+            if fit['gustafson_serial_fraction'] is not None:
+                line += f" | Gustafson serial fraction {fit['gustafson_serial_fraction']:.2f}"
+            print(line)
+            continue
+        line = (f"{fit['algorithm']} {fit['mode']} {fit['size']}: best relative {fit['best_speedup']:.2f}x on "
+                f"{fit['best_clients']} client(s), adding clients stops paying off after {fit['knee_clients']}")
+        if fit['amdahl_parallel_fraction'] is not None:
+            limit = f"{fit['amdahl_max_speedup']:.1f}x" if fit['amdahl_max_speedup'] else 'unbounded'
+            line += f" | Amdahl parallel fraction {fit['amdahl_parallel_fraction']:.2f} (limit {limit})"
+        print(line)
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Distributed sorting scaling experiments')
+    parser.add_argument('--server', default='http://localhost:5000', help='Master server URL')
+    parser.add_argument('--algorithms', default='quicksort', help='Comma-separated algorithms')
+    parser.add_argument('--modes', default=','.join(DEFAULT_MODES),
+                        help=f"Comma-separated parallel modes out of {', '.join(MODES)} (serial always runs as baseline)")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='Comma-separated data sizes')
+    parser.add_argument('--clients', default=','.join(map(str, DEFAULT_CLIENT_COUNTS)),
+                        help='Comma-separated client counts')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per case')
+    parser.add_argument('--distribution', default='uniform', choices=datasets.DISTRIBUTIONS, help='Input distribution')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the generated data')
+    parser.add_argument('--run-size', type=int, help='Numbers per run in external mode')
+    parser.add_argument('--weak-scaling', action='store_true',
+                        help='Also sort sizes x clients on each client count, for the Gustafson fit')
+    parser.add_argument('--spawn', type=int, default=0, help='Local clients to start for the sweep')
+    parser.add_argument('--output', help='Write runs and fits as JSON to this file')
+
+    args = parser.parse_args()
+
+    modes = args.modes.split(',')
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f"Unknown modes: {', '.join(unknown)}")
+    server = args.server.rstrip('/')
+    sizes = [int(float(size)) for size in args.sizes.split(',')]
+    client_counts = sorted(int(count) for count in args.clients.split(','))
+
+    spawned = spawn_clients(server, args.spawn)
+    try:
+        runs, fits = run_experiments(server, args.algorithms.split(','), modes, sizes, client_counts,
+                                     args.repeats, args.distribution, args.seed, args.run_size, args.weak_scaling)
+    except (RuntimeError, requests.RequestException) as e:
+        print(f"Experiment failed: {e}")
+        sys.exit(1)
+    finally:
+        for process in spawned:
+            process.terminate()
+
+    print_report(runs, fits)
+
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now().isoformat(),
+                'server': server,
+                'repeats': args.repeats,
+                'distribution': args.distribution,
+                'seed': args.seed,
+                'weak_scaling': args.weak_scaling
+            },
+            'runs': runs,
+            'fits': fits
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -1,16 +1,35 @@
 # master.py
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 import random
 import time
 import json
-from collections import defaultdict
+import os
+import sys
+from collections import defaultdict, deque
 from datetime import datetime
 import threading
-from algorithms import get_algorithm_info
+import heapq
+from array import array
+from bisect import bisect_right
+from itertools import islice
+from algorithms import get_algorithm_info, is_sorted, fingerprint
+import protocol
+import storage
+import datasets
+
+# NumPy is optional; it vectorizes range partitioning when available
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 app = Flask(__name__)
 
 # Storage
+# Batches and results are kept as compact int32 arrays rather than lists of
+# Python ints; chunks are handed out as memoryview slices of the batch.
+BATCH_TYPECODE = 'i'
+
 batches = {}
 clients_connected = {}
 sorting_progress = defaultdict(dict)
@@ -23,19 +42,144 @@ performance_stats = {
     'average_times': defaultdict(list)
 }
 
+# Batch inputs and sorted results live in memory-mapped files under
+# storage.DATA_DIR, with their metadata and the benchmarks saved as JSON, so
+# they survive a master restart. Old batches are evicted past these limits.
+MAX_BATCHES = int(os.environ.get('SORT_MAX_BATCHES', 50))
+BATCH_RETENTION_SECONDS = int(os.environ.get('SORT_BATCH_RETENTION_SECONDS', 7 * 24 * 3600))
+MAX_BENCHMARKS = 1000
+
+# Scheduling state that only makes sense while a sort is running
+RUNTIME_PROGRESS_FIELDS = ('pending', 'merge_runs', 'merges_in_flight',
+                           'partitioned_numbers', 'range_result', 'final_result')
+
+persist_lock = threading.Lock()
+
+# Work index so get_work never scans past batches: chunks handed to each
+# client as (batch_id, chunk_id), and parallel batches still being sorted
+client_work = defaultdict(deque)
+active_batches = {}
+# Chunks already sent to each client, so pipelining clients can ask for the next one
+delivered_work = defaultdict(set)
+
+# Server-sent events: every topic ('clients', 'benchmarks', 'progress:<batch_id>')
+# has a version that is bumped when it changes, and each /api/events stream
+# sends the topics that moved since its last send. Bursts of updates are
+# coalesced into one event per topic per SSE_MIN_INTERVAL.
+event_versions = defaultdict(int, {'clients': 1, 'benchmarks': 1})
+events_changed = threading.Condition()
+SSE_MIN_INTERVAL = 0.25
+SSE_KEEPALIVE_SECONDS = 15
+
+def publish(*topics):
+    """Mark topics as changed and wake the event streams"""
+    with events_changed:
+        for topic in topics:
+            event_versions[topic] += 1
+        events_changed.notify_all()
+
 def cleanup_clients():
     """Background thread to clean up disconnected clients"""
     while True:
         time.sleep(5)
         current_time = time.time()
-        disconnected = []
-        for client_id, client in clients_connected.items():
-            if current_time - client['last_seen'] > 10:
-                disconnected.append(client_id)
+        with schedule_lock:
+            disconnected = [client_id for client_id, client in clients_connected.items()
+                            if current_time - client['last_seen'] > 10]
+            
+            for client_id in disconnected:
+                print(f"Client {client_id} disconnected")
+                del clients_connected[client_id]
+                # Its chunks go back to the queue, or to the other copy if one is running
+                for batch_id, chunk_id in client_work.pop(client_id, ()):
+                    progress = sorting_progress.get(batch_id)
+                    chunk_info = progress['chunks'].get(chunk_id) if progress else None
+                    if chunk_info:
+                        release_chunk(batch_id, progress, chunk_info, client_id)
+                delivered_work.pop(client_id, None)
+        
+        if disconnected:
+            publish('clients')
+        
+        evict_batches()
+
+def save_batch(batch_id):
+    """Write a batch's metadata (and its progress, once sorted) to disk"""
+    with schedule_lock:
+        batch = batches[batch_id]
+        metadata = {'batch': {key: value for key, value in batch.items() if key != 'numbers'}}
+        progress = sorting_progress.get(batch_id)
+        if progress and progress.get('final_result') is not None:
+            metadata['progress'] = {key: value for key, value in progress.items()
+                                    if key not in RUNTIME_PROGRESS_FIELDS}
+            metadata['progress']['chunks'] = {chunk_id: dict(chunk) for chunk_id, chunk in progress['chunks'].items()}
+    with persist_lock:
+        storage.save_metadata(f"{batch_id}_meta", metadata)
+
+def save_benchmarks():
+    with schedule_lock:
+        snapshot = list(benchmark_results)
+    with persist_lock:
+        storage.save_metadata('benchmarks', snapshot)
+
+def load_state():
+    """Reload stored batches, sorted results and benchmarks after a restart"""
+    for name in storage.list_metadata('_meta'):
+        batch_id = name[:-len('_meta')]
+        metadata = storage.load_metadata(name)
+        if not metadata or not storage.array_exists(f"{batch_id}_numbers"):
+            continue
         
-        for client_id in disconnected:
-            print(f"Client {client_id} disconnected")
-            del clients_connected[client_id]
+        numbers = storage.map_array(f"{batch_id}_numbers", BATCH_TYPECODE)
+        progress = metadata.get('progress')
+        if progress and storage.array_exists(f"{batch_id}_sorted"):
+            # JSON turned the chunk ids into strings
+            progress['chunks'] = {int(chunk_id): chunk for chunk_id, chunk in progress['chunks'].items()}
+            progress['final_result'] = storage.map_array(f"{batch_id}_sorted", BATCH_TYPECODE)
+        else:
+            progress = None
+        
+        with schedule_lock:
+            batches[batch_id] = dict(metadata['batch'], numbers=numbers)
+            if progress:
+                sorting_progress[batch_id] = progress
+    
+    for benchmark in storage.load_metadata('benchmarks', [])[-MAX_BENCHMARKS:]:
+        benchmark_results.append(benchmark)
+        update_performance_stats(benchmark)
+    
+    if batches:
+        print(f"Loaded {len(batches)} stored batches and {len(benchmark_results)} benchmarks")
+
+def evict_batches():
+    """Delete batches older than the retention period or beyond MAX_BATCHES"""
+    with schedule_lock:
+        evictable = []
+        for batch_id, batch in list(batches.items()):
+            progress = sorting_progress.get(batch_id)
+            if batch_id in active_batches or (progress and progress.get('final_result') is None
+                                              and not progress.get('failed')):
+                continue
+            evictable.append((batch['created_at'], batch_id))
+        evictable.sort()
+        
+        cutoff = datetime.now().timestamp() - BATCH_RETENTION_SECONDS
+        excess = len(batches) - MAX_BATCHES
+        expired = []
+        for created_at, batch_id in evictable:
+            if excess > 0 or datetime.fromisoformat(created_at).timestamp() < cutoff:
+                expired.append(batch_id)
+                excess -= 1
+        
+        for batch_id in expired:
+            del batches[batch_id]
+            sorting_progress.pop(batch_id, None)
+    
+    for batch_id in expired:
+        print(f"Evicting batch {batch_id}")
+        storage.delete_array(f"{batch_id}_numbers")
+        storage.delete_array(f"{batch_id}_sorted")
+        storage.delete_metadata(f"{batch_id}_meta")
 
 def update_performance_stats(benchmark):
     """Update performance stats including latest serial/parallel"""
@@ -63,6 +207,418 @@ def update_performance_stats(benchmark):
     if len(performance_stats['average_times'][key]) > 10:
         performance_stats['average_times'][key] = performance_stats['average_times'][key][-10:]
 
+merge_lock = threading.Lock()
+# Signalled whenever a merge-tree merge lands, for the final merge to wait on
+merges_done = threading.Condition(merge_lock)
+# Guards scheduling and the shared registries (clients_connected, batches,
+# sorting_progress, benchmarks); payloads are copied out under it so that
+# request threads never serialize a dict another thread is changing
+schedule_lock = threading.RLock()
+
+# Long-polling clients park on this until new work is scheduled
+work_available = threading.Condition(schedule_lock)
+LONG_POLL_MAX_SECONDS = 30
+# Parked polls also re-check periodically so stragglers can be re-issued
+LONG_POLL_RECHECK_SECONDS = 1.0
+
+# Long polls and event streams each hold a server thread while parked. The
+# server gets one thread per expected client plus RESERVED_THREADS, and only
+# the former may be parked, so submits and the dashboard are never starved;
+# polls beyond that are answered at once and told to come back later
+EXPECTED_CLIENTS = 64
+RESERVED_THREADS = 16
+parked_slots = threading.BoundedSemaphore(EXPECTED_CLIENTS)
+LONG_POLL_BUSY_RETRY_SECONDS = 2
+
+# Parallel batches are over-decomposed into this many chunks per client and
+# handed out from a queue, so faster clients simply pull more chunks
+DEFAULT_CHUNKS_PER_CLIENT = 4
+
+# Once the queue is empty, an idle client gets a copy of a chunk that has
+# been running this many times longer than the median finished chunk
+SPECULATE_FACTOR = 2.0
+SPECULATE_MIN_SECONDS = 1.0
+
+# A batch is given up once one of its chunks has failed verification more often than this
+MAX_REJECTED_RESULTS = 3
+
+def merge_runs(runs):
+    """K-way merge of sorted runs using a heap"""
+    return array(BATCH_TYPECODE, heapq.merge(*runs))
+
+def merge_completed_chunk(batch_id, progress, chunk_id, data):
+    """Count a finished chunk and hand it to a background thread for merging"""
+    with merge_lock:
+        progress.setdefault('merge_runs', {})
+        progress['completed_chunks'] += 1
+        is_last = progress['completed_chunks'] >= progress['total_chunks']
+        if is_last:
+            progress['merging'] = True
+        else:
+            progress['merges_in_flight'] = progress.get('merges_in_flight', 0) + 1
+    
+    threading.Thread(target=merge_into_tree, args=(batch_id, progress, chunk_id, data, is_last),
+                     daemon=True).start()
+
+def merge_into_tree(batch_id, progress, chunk_id, data, is_last):
+    """Fold a finished chunk into the batch's merge tree.
+
+    Chunks are the leaves of a binary merge tree and two sibling runs are
+    merged as soon as both are done, so most of the merge work overlaps
+    with chunks that are still being sorted. The last chunk waits for the
+    merges still in flight, then does a single k-way merge of the runs
+    that are left and finishes the batch.
+    """
+    total_chunks = progress['total_chunks']
+    runs = progress['merge_runs']
+    
+    if is_last:
+        with merges_done:
+            while progress.get('merges_in_flight'):
+                merges_done.wait()
+            remaining = list(runs.values())
+            runs.clear()
+        final_result = storage.write_array(f"{batch_id}_sorted", merge_runs(remaining + [data]), BATCH_TYPECODE)
+        progress.pop('merging', None)
+        finish_batch(batch_id, progress, final_result)
+        return
+    
+    level, index = 0, chunk_id
+    while True:
+        with merge_lock:
+            sibling = index ^ 1
+            while (sibling << level) >= total_chunks and (1 << level) < total_chunks:
+                # No chunks under the sibling subtree, promote the run as-is
+                level, index = level + 1, index >> 1
+                sibling = index ^ 1
+            
+            if (level, sibling) not in runs:
+                runs[(level, index)] = data
+                progress['merges_in_flight'] -= 1
+                merges_done.notify_all()
+                return
+            sibling_data = runs.pop((level, sibling))
+        
+        data = array(BATCH_TYPECODE, heapq.merge(sibling_data, data))
+        level, index = level + 1, index >> 1
+
+def assign_chunk(batch_id, chunk_info, client_id, status=None):
+    """Mark a chunk as handed out to a client and index it under that client"""
+    chunk_info['client_id'] = client_id
+    chunk_info['status'] = 'assigned'
+    chunk_info['assigned_at'] = time.time()
+    client_work[client_id].append((batch_id, chunk_info['chunk_id']))
+    if client_id in clients_connected:
+        clients_connected[client_id]['status'] = status or f"processing_chunk_{chunk_info['chunk_id']}"
+    publish('clients', f'progress:{batch_id}')
+
+def find_straggler(progress, client_id):
+    """Pick the longest-running chunk worth re-issuing to another client"""
+    finished = sorted(chunk['processing_time'] for chunk in progress['chunks'].values()
+                      if chunk['status'] == 'completed' and chunk['processing_time'])
+    if not finished:
+        return None
+    
+    threshold = max(SPECULATE_MIN_SECONDS, SPECULATE_FACTOR * finished[len(finished) // 2])
+    now = time.time()
+    # A chunk whose speculative copy is itself running past the threshold
+    # may be copied again; the new copy takes the speculative slot
+    candidates = [
+        chunk for chunk in progress['chunks'].values()
+        if chunk['status'] == 'assigned' and client_id not in (chunk['client_id'], chunk.get('speculative_client'))
+        and now - chunk.get('speculative_at', chunk['assigned_at']) > threshold
+    ]
+    return min(candidates, key=lambda chunk: chunk.get('speculative_at', chunk['assigned_at']), default=None)
+
+def may_work_on(progress, client_id):
+    """Whether a client may take queued or straggler chunks of a batch.
+
+    Batches started with max_clients stay on the clients they started with,
+    so scaling experiments measure exactly that many clients.
+    """
+    return not progress.get('client_limit') or client_id in progress['assigned_clients']
+
+def next_chunk(client_id, skip_delivered=False):
+    """Find work for a client: its own chunk first, then queued chunks, then stragglers.
+
+    With skip_delivered, chunks the client has already been sent are passed
+    over, so a pipelining client gets the next chunk instead of its current one.
+    """
+    algorithms = clients_connected.get(client_id, {}).get('algorithms', [])
+    
+    with schedule_lock:
+        # Entries for chunks that were finished (or restarted) since are dropped lazily
+        assigned = client_work.get(client_id)
+        delivered = delivered_work.get(client_id, set())
+        for entry in list(assigned or ()):
+            batch_id, chunk_id = entry
+            progress = sorting_progress.get(batch_id)
+            chunk_info = progress['chunks'].get(chunk_id) if progress else None
+            if (chunk_info and chunk_info['status'] == 'assigned' and
+                client_id in (chunk_info['client_id'], chunk_info.get('speculative_client'))):
+                if not (skip_delivered and entry in delivered):
+                    return batch_id, progress, chunk_id, chunk_info
+            else:
+                assigned.remove(entry)
+                delivered.discard(entry)
+        
+        if client_id not in clients_connected:
+            return None
+        
+        for batch_id, progress in active_batches.items():
+            if not may_work_on(progress, client_id):
+                continue
+            # A re-queued chunk may have been finished by a late result meanwhile
+            while progress['pending'] and progress['chunks'][progress['pending'][0]]['status'] == 'completed':
+                progress['pending'].popleft()
+            if progress['pending'] and progress['algorithm'] in algorithms:
+                chunk_info = progress['chunks'][progress['pending'].popleft()]
+                assign_chunk(batch_id, chunk_info, client_id)
+                return batch_id, progress, chunk_info['chunk_id'], chunk_info
+        
+        for batch_id, progress in active_batches.items():
+            if progress['algorithm'] not in algorithms or not may_work_on(progress, client_id):
+                continue
+            chunk_info = find_straggler(progress, client_id)
+            if chunk_info:
+                chunk_info['speculative_client'] = client_id
+                chunk_info['speculative_at'] = time.time()
+                client_work[client_id].append((batch_id, chunk_info['chunk_id']))
+                clients_connected[client_id]['status'] = f"processing_chunk_{chunk_info['chunk_id']}"
+                publish('clients', f'progress:{batch_id}')
+                print(f"Re-issuing straggler chunk {chunk_info['chunk_id']} of {batch_id} to {client_id}")
+                return batch_id, progress, chunk_info['chunk_id'], chunk_info
+    
+    return None
+
+def release_chunk(batch_id, progress, chunk_info, client_id):
+    """Take a chunk away from a client, leaving it to its other copy or the queue.
+    
+    Returns False for a serial chunk, which has no queue to go back to.
+    Callers hold schedule_lock.
+    """
+    if chunk_info['status'] != 'assigned':
+        # Finished, or already back in the queue
+        return True
+    
+    if chunk_info.get('speculative_client') == client_id:
+        # The original copy is still running
+        chunk_info.pop('speculative_client')
+        chunk_info.pop('speculative_at', None)
+    elif chunk_info['client_id'] != client_id:
+        # The client's copy was already replaced by a newer one
+        pass
+    elif chunk_info.get('speculative_client'):
+        chunk_info['client_id'] = chunk_info.pop('speculative_client')
+        chunk_info['assigned_at'] = chunk_info.pop('speculative_at', time.time())
+    elif batch_id in active_batches:
+        chunk_info['status'] = 'pending'
+        chunk_info['client_id'] = None
+        progress['pending'].appendleft(chunk_info['chunk_id'])
+        work_available.notify_all()
+    else:
+        return False
+    publish(f'progress:{batch_id}')
+    return True
+
+def reject_chunk(batch_id, progress, chunk_info, client_id):
+    """Hand a chunk whose result failed verification to someone else"""
+    print(f"Rejected result for chunk {chunk_info['chunk_id']} of {batch_id} from {client_id}")
+    with schedule_lock:
+        entry = (batch_id, chunk_info['chunk_id'])
+        if entry in client_work.get(client_id, ()):
+            client_work[client_id].remove(entry)
+        delivered_work.get(client_id, set()).discard(entry)
+        chunk_info['rejected_results'] = chunk_info.get('rejected_results', 0) + 1
+        
+        if chunk_info['rejected_results'] > MAX_REJECTED_RESULTS:
+            fail_batch(batch_id, progress, f"chunk {chunk_info['chunk_id']} failed verification "
+                                           f"{chunk_info['rejected_results']} times")
+        elif not release_chunk(batch_id, progress, chunk_info, client_id):
+            # A serial batch has nobody else to give it to, so its client sorts it again
+            client_work[client_id].append(entry)
+            touch_client(client_id, status='processing_serial')
+            work_available.notify_all()
+    publish(f'progress:{batch_id}')
+
+def fail_batch(batch_id, progress, reason):
+    """Stop scheduling a batch that cannot be finished and report why"""
+    print(f"Batch {batch_id} failed: {reason}")
+    with schedule_lock:
+        progress['failed'] = reason
+        progress['total_time'] = time.time() - progress['start_time']
+        active_batches.pop(batch_id, None)
+        # Clients drop the chunks they still hold on their next poll
+        for chunk_info in progress['chunks'].values():
+            if chunk_info['status'] != 'completed':
+                chunk_info['status'] = 'failed'
+    publish(f'progress:{batch_id}')
+
+def wait_for_chunk(client_id, timeout, skip_delivered=False):
+    """Long-poll: block until there is work for the client or the timeout runs out"""
+    deadline = time.time() + timeout
+    with work_available:
+        while True:
+            work = next_chunk(client_id, skip_delivered)
+            remaining = deadline - time.time()
+            if work is not None or remaining <= 0:
+                return work
+            # A parked poll doubles as the client's heartbeat
+            touch_client(client_id)
+            work_available.wait(min(remaining, LONG_POLL_RECHECK_SECONDS))
+
+def batch_view(batch_id, start_idx=0, end_idx=None):
+    """Zero-copy view of a slice of a batch's numbers"""
+    numbers = sorting_progress.get(batch_id, {}).get('partitioned_numbers')
+    if numbers is None:
+        numbers = batches[batch_id]['numbers']
+    return memoryview(numbers)[start_idx:end_idx]
+
+def range_partition(numbers, parts, oversample=32):
+    """Regroup numbers into `parts` contiguous value ranges (sample sort).
+
+    Splitters are picked from a random sample of the batch. Returns the
+    regrouped array and the (start_idx, end_idx) bounds of each range, so
+    sorting every range independently and concatenating them in order
+    gives the fully sorted batch.
+    """
+    total_numbers = len(numbers)
+    typecode = memoryview(numbers).format
+    splitters = []
+    if total_numbers:
+        sample = sorted(numbers[random.randrange(total_numbers)] for _ in range(parts * oversample))
+        splitters = [sample[i * oversample] for i in range(1, parts)]
+    
+    if np is not None:
+        values = np.frombuffer(numbers, dtype=typecode)
+        buckets = np.searchsorted(np.array(splitters, dtype=values.dtype), values, side='right')
+        # Small integer keys make the stable argsort a linear-time radix sort
+        buckets = buckets.astype(np.uint16 if parts < 65536 else np.int64)
+        order = np.argsort(buckets, kind='stable')
+        partitioned = array(typecode)
+        partitioned.frombytes(memoryview(values[order]).cast('B'))
+        counts = np.bincount(buckets, minlength=parts).tolist()
+    else:
+        groups = [array(typecode) for _ in range(parts)]
+        for value in numbers:
+            groups[bisect_right(splitters, value)].append(value)
+        partitioned = array(typecode)
+        for group in groups:
+            partitioned.extend(group)
+        counts = [len(group) for group in groups]
+    
+    bounds = []
+    start_idx = 0
+    for count in counts:
+        bounds.append((start_idx, start_idx + count))
+        start_idx += count
+    return partitioned, bounds
+
+def assemble_range_chunk(progress, chunk_info, data):
+    """Copy a sorted value range into place; returns the result once complete"""
+    with merge_lock:
+        result = progress.get('range_result')
+        if result is None:
+            result = progress['range_result'] = array(BATCH_TYPECODE, [0]) * len(progress['partitioned_numbers'])
+        result[chunk_info['start_idx']:chunk_info['end_idx']] = data
+        progress['completed_chunks'] += 1
+        if progress['completed_chunks'] >= progress['total_chunks']:
+            return progress.pop('range_result')
+    return None
+
+# External sort: the batch is handed out in runs of this many numbers, each
+# sorted run is stored on disk, and the runs are merged back into the result
+# file reading and writing MERGE_BUFFER_SIZE numbers at a time
+EXTERNAL_RUN_SIZE = 1000000
+MERGE_BUFFER_SIZE = 65536
+
+def run_name(batch_id, chunk_id):
+    return f"{batch_id}_run_{chunk_id}"
+
+def store_external_run(batch_id, progress, chunk_id, data):
+    """Write a sorted run to disk; the last one starts the merge in the background"""
+    storage.write_array(run_name(batch_id, chunk_id), data, BATCH_TYPECODE)
+    with merge_lock:
+        progress['completed_chunks'] += 1
+        if progress['completed_chunks'] < progress['total_chunks']:
+            return
+        progress['merging'] = True
+    
+    threading.Thread(target=merge_external_runs, args=(batch_id, progress), daemon=True).start()
+
+def merge_external_runs(batch_id, progress):
+    """Buffered multi-way merge of a batch's sorted runs into its result file"""
+    names = [run_name(batch_id, chunk_id) for chunk_id, chunk in sorted(progress['chunks'].items())
+             if chunk['size']]
+    merge_start = time.time()
+    
+    merged = heapq.merge(*(storage.read_values(name, MERGE_BUFFER_SIZE, BATCH_TYPECODE) for name in names))
+    def blocks():
+        while True:
+            block = array(BATCH_TYPECODE, islice(merged, MERGE_BUFFER_SIZE))
+            if not block:
+                return
+            yield block
+    final_result = storage.write_array(f"{batch_id}_sorted", blocks(), BATCH_TYPECODE)
+    
+    for name in names:
+        storage.delete_array(name)
+    
+    # Every number is read once from the runs and written once to the result
+    progress['merge_time'] = time.time() - merge_start
+    megabytes = len(final_result) * final_result.itemsize / 1e6
+    progress['merge_throughput'] = 2 * megabytes / progress['merge_time'] if progress['merge_time'] > 0 else None
+    print(f"Merged {len(names)} runs ({megabytes:.1f} MB) in {progress['merge_time']:.3f}s")
+    
+    progress.pop('merging', None)
+    finish_batch(batch_id, progress, final_result)
+
+def finish_batch(batch_id, progress, final_result):
+    """Record a batch's stored sorted result and its benchmark"""
+    progress['final_result'] = final_result
+    progress['total_time'] = time.time() - progress['start_time']
+    progress.pop('partitioned_numbers', None)
+    with schedule_lock:
+        active_batches.pop(batch_id, None)
+    
+    # Calculate total processing time
+    total_processing_time = sum(chunk.get('processing_time') or 0 for chunk in progress['chunks'].values())
+    
+    clients_used = list(set(chunk['client_id'] for chunk in progress['chunks'].values() if chunk['client_id']))
+    
+    # Create benchmark record
+    benchmark = {
+        'batch_id': batch_id,
+        'mode': progress['mode'],
+        'distribution': progress.get('distribution'),
+        'algorithm': progress['algorithm'],
+        'total_numbers': len(final_result),
+        'total_time': progress['total_time'],
+        'processing_time': total_processing_time,
+        'clients_used': clients_used,
+        'clients_count': len(clients_used),
+        'chunks_count': len(progress['chunks']),
+        'throughput_mb_per_s': len(final_result) * final_result.itemsize / 1e6 / max(progress['total_time'], 1e-9),
+        'timestamp': datetime.now().isoformat()
+    }
+    if 'merge_throughput' in progress:
+        benchmark['merge_throughput_mb_per_s'] = progress['merge_throughput']
+    chosen = [chunk['chosen_algorithm'] for chunk in progress['chunks'].values() if chunk.get('chosen_algorithm')]
+    if chosen:
+        benchmark['algorithms_chosen'] = {name: chosen.count(name) for name in sorted(set(chosen))}
+    
+    with schedule_lock:
+        benchmark_results.append(benchmark)
+        del benchmark_results[:-MAX_BENCHMARKS]
+        update_performance_stats(benchmark)
+    save_batch(batch_id)
+    save_benchmarks()
+    publish('benchmarks', f'progress:{batch_id}')
+    print(f"Benchmark saved: {benchmark['mode']} {benchmark['algorithm']} - {benchmark['total_time']:.3f}s "
+          f"({benchmark['throughput_mb_per_s']:.1f} MB/s)")
+
+load_state()
+
 # Start cleanup thread
 cleanup_thread = threading.Thread(target=cleanup_clients, daemon=True)
 cleanup_thread.start()
@@ -94,33 +650,137 @@ def get_algorithms():
     })
 
 # API Routes
+# Ids handed out by new_batch_id whose batch is still being written
+reserved_batch_ids = set()
+
+def new_batch_id():
+    """Reserve a timestamped batch id, suffixed when one was already taken that second.
+
+    The id stays reserved until the batch is registered (or the caller gives
+    it up), so concurrent requests never write to the same files.
+    """
+    batch_id = base_id = f"batch_{int(time.time())}"
+    suffix = 1
+    with schedule_lock:
+        while (batch_id in batches or batch_id in reserved_batch_ids or
+               storage.array_exists(f"{batch_id}_numbers")):
+            suffix += 1
+            batch_id = f"{base_id}_{suffix}"
+        reserved_batch_ids.add(batch_id)
+    return batch_id
+
 @app.route('/api/generate', methods=['POST'])
 def generate_numbers():
+    """Generate a seeded batch, written to the store block by block.
+
+    distribution is one of datasets.DISTRIBUTIONS (default 'uniform');
+    passing the seed of an earlier batch replays the same numbers.
+    """
     data = request.json
-    count = data.get('count', 10000)
-    batch_id = f"batch_{int(time.time())}"
+    distribution = data.get('distribution', 'uniform')
     
-    numbers = [random.randint(1, 1000000) for _ in range(count)]
-    batches[batch_id] = {
-        'numbers': numbers,
-        'count': count,
-        'created_at': datetime.now().isoformat(),
-        'algorithm': data.get('algorithm', 'quicksort')
-    }
+    # Everything is checked before an id is reserved
+    try:
+        count = int(data.get('count', 10000))
+        seed = data.get('seed')
+        seed = datasets.new_seed() if seed in (None, '') else int(seed)
+        params = {key: int(data[key]) for key in ('low', 'high', 'swaps', 'unique') if data.get(key) is not None}
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': 'count, seed, low, high, swaps and unique must be integers'}), 400
+    
+    try:
+        blocks = datasets.generate_blocks(distribution, count, seed, typecode=BATCH_TYPECODE, **params)
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    batch_id = new_batch_id()
+    try:
+        numbers = storage.write_array(f"{batch_id}_numbers", blocks, BATCH_TYPECODE)
+    except ValueError as e:
+        with schedule_lock:
+            reserved_batch_ids.discard(batch_id)
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    with schedule_lock:
+        reserved_batch_ids.discard(batch_id)
+        batches[batch_id] = {
+            'numbers': numbers,
+            'count': count,
+            'created_at': datetime.now().isoformat(),
+            'algorithm': data.get('algorithm', 'quicksort'),
+            'distribution': distribution,
+            'seed': seed,
+            'params': params
+        }
+    save_batch(batch_id)
     
     return jsonify({
         'status': 'success',
         'batch_id': batch_id,
         'count': count,
-        'sample_data': numbers[:50]
+        'distribution': distribution,
+        'seed': seed,
+        'sample_data': numbers[:50].tolist()
+    })
+
+@app.route('/api/import', methods=['POST'])
+def import_numbers():
+    """Create a batch from raw little-endian int32s in the request body.
+
+    The body is streamed to disk block by block, so the dataset never has
+    to fit in the master's memory; pair it with an external sort.
+    """
+    batch_id = new_batch_id()
+    itemsize = array(BATCH_TYPECODE).itemsize
+    
+    def blocks():
+        leftover = b''
+        while True:
+            raw = request.stream.read(STREAM_BLOCK_SIZE * itemsize)
+            if not raw:
+                break
+            raw = leftover + raw
+            usable = len(raw) - len(raw) % itemsize
+            leftover = raw[usable:]
+            block = array(BATCH_TYPECODE)
+            block.frombytes(raw[:usable])
+            if sys.byteorder == 'big':
+                block.byteswap()
+            yield block
+        if leftover:
+            raise ValueError(f"Body is not a whole number of {itemsize}-byte integers")
+    
+    try:
+        numbers = storage.write_array(f"{batch_id}_numbers", blocks(), BATCH_TYPECODE)
+    except ValueError as e:
+        with schedule_lock:
+            reserved_batch_ids.discard(batch_id)
+        return jsonify({'status': 'error', 'message': str(e)}), 400
+    
+    with schedule_lock:
+        reserved_batch_ids.discard(batch_id)
+        batches[batch_id] = {
+            'numbers': numbers,
+            'count': len(numbers),
+            'created_at': datetime.now().isoformat(),
+            'algorithm': request.args.get('algorithm', 'quicksort')
+        }
+    save_batch(batch_id)
+    
+    return jsonify({
+        'status': 'success',
+        'batch_id': batch_id,
+        'count': len(numbers),
+        'sample_data': numbers[:50].tolist()
     })
 
 @app.route('/api/register', methods=['POST'])
 def register_client():
     data = request.json
     client_id = data['client_id']
+    wire_format, compression = protocol.negotiate(data.get('wire_formats'), data.get('compression'))
     
-    clients_connected[client_id] = {
+    client = {
         'id': client_id,
         'capabilities': data.get('capabilities', []),
         'algorithms': data.get('algorithms', ['quicksort']),
@@ -129,36 +789,63 @@ def register_client():
         'system_info': data.get('system_info', {}),
         'last_seen': time.time(),
         'status': 'idle',
+        'wire_format': wire_format,
+        'compression': compression,
         'registered_at': datetime.now().isoformat()
     }
+    with schedule_lock:
+        clients_connected[client_id] = client
     
     print(f"Client registered: {client_id}")
     print(f"Client algorithms: {data.get('algorithms', [])}")
-    return jsonify({'status': 'registered'})
+    print(f"Client wire format: {wire_format} (compression: {compression})")
+    publish('clients')
+    return jsonify({
+        'status': 'registered',
+        'wire_format': wire_format,
+        'compression': compression,
+        'long_poll': True,
+        'long_poll_max_seconds': LONG_POLL_MAX_SECONDS
+    })
+
+def touch_client(client_id, **fields):
+    """Mark a client as seen now and update other fields, if it is still registered"""
+    with schedule_lock:
+        client = clients_connected.get(client_id)
+        if client is None:
+            return False
+        client['last_seen'] = time.time()
+        client.update(fields)
+        return True
 
 @app.route('/api/heartbeat', methods=['POST'])
 def heartbeat():
     data = request.json
     client_id = data['client_id']
     
-    if client_id in clients_connected:
-        clients_connected[client_id]['last_seen'] = time.time()
+    if touch_client(client_id):
         return jsonify({'status': 'updated'})
     else:
         return jsonify({'status': 'not_found'})
 
+def clients_payload():
+    with schedule_lock:
+        clients = {client_id: dict(client) for client_id, client in clients_connected.items()}
+    return {
+        'clients': clients,
+        'count': len(clients)
+    }
+
 @app.route('/api/clients')
 def get_clients():
-    return jsonify({
-        'clients': clients_connected,
-        'count': len(clients_connected)
-    })
+    return jsonify(clients_payload())
 
 def get_idle_clients(algorithm):
-    return [
-        client_id for client_id, client in clients_connected.items()
-        if client['status'] == 'idle' and algorithm in client.get('algorithms', [])
-    ]
+    with schedule_lock:
+        return [
+            client_id for client_id, client in clients_connected.items()
+            if client['status'] == 'idle' and algorithm in client.get('algorithms', [])
+        ]
 
 @app.route('/api/start-serial', methods=['POST'])
 def start_serial():
@@ -176,7 +863,7 @@ def start_serial():
     
     assigned_client = idle_clients[0]
     
-    sorting_progress[batch_id] = {
+    progress = {
         'mode': 'serial',
         'algorithm': algorithm,
         'start_time': time.time(),
@@ -184,9 +871,9 @@ def start_serial():
         'total_chunks': 1,
         'chunks': {
             0: {
-                'client_id': assigned_client,
+                'client_id': None,
                 'chunk_id': 0,
-                'status': 'assigned',
+                'status': 'pending',
                 'size': len(batches[batch_id]['numbers']),
                 'processed_data': None,
                 'processing_time': None
@@ -195,7 +882,11 @@ def start_serial():
         'assigned_client': assigned_client
     }
     
-    clients_connected[assigned_client]['status'] = 'processing_serial'
+    with schedule_lock:
+        sorting_progress[batch_id] = progress
+        active_batches.pop(batch_id, None)
+        assign_chunk(batch_id, progress['chunks'][0], assigned_client, status='processing_serial')
+        work_available.notify_all()
     
     return jsonify({
         'status': 'started',
@@ -210,11 +901,24 @@ def start_parallel():
     data = request.json
     batch_id = data['batch_id']
     algorithm = data.get('algorithm', 'quicksort')
+    # 'index' splits the batch by position and merges afterwards,
+    # 'range' sample-sorts it into value ranges that just get concatenated,
+    # 'external' hands out fixed-size runs that are merged on disk
+    distribution = data.get('distribution', 'index')
+    chunks_per_client = max(1, int(data.get('chunks_per_client', DEFAULT_CHUNKS_PER_CLIENT)))
+    run_size = max(1, int(data.get('run_size', EXTERNAL_RUN_SIZE)))
+    # Optional cap on the clients used, for scaling experiments
+    max_clients = data.get('max_clients')
     
     if batch_id not in batches:
         return jsonify({'status': 'error', 'message': 'Batch not found'})
     
+    if distribution not in ('index', 'range', 'external'):
+        return jsonify({'status': 'error', 'message': f'Unknown distribution: {distribution}'})
+    
     idle_clients = get_idle_clients(algorithm)
+    if max_clients:
+        idle_clients = idle_clients[:int(max_clients)]
     
     if not idle_clients:
         return jsonify({'status': 'error', 'message': 'No idle clients available'})
@@ -222,26 +926,42 @@ def start_parallel():
     numbers = batches[batch_id]['numbers']
     total_numbers = len(numbers)
     total_clients = len(idle_clients)
-    chunk_size = total_numbers // total_clients
+    if distribution == 'external':
+        total_chunks = max(1, -(-total_numbers // run_size))
+    else:
+        total_chunks = max(1, min(total_clients * chunks_per_client, total_numbers))
+    chunk_size = total_numbers // total_chunks
     
-    sorting_progress[batch_id] = {
+    progress = {
         'mode': 'parallel',
+        'distribution': distribution,
         'algorithm': algorithm,
         'start_time': time.time(),
         'completed_chunks': 0,
-        'total_chunks': total_clients,
+        'total_chunks': total_chunks,
         'chunks': {},
-        'assigned_clients': idle_clients
+        'pending': deque(),
+        'assigned_clients': idle_clients,
+        'client_limit': int(max_clients) if max_clients else None
     }
     
-    for i, client_id in enumerate(idle_clients):
-        start_idx = i * chunk_size
-        end_idx = start_idx + chunk_size if i < total_clients - 1 else total_numbers
+    if distribution == 'range':
+        progress['partitioned_numbers'], bounds = range_partition(numbers, total_chunks)
+        progress['partition_time'] = time.time() - progress['start_time']
+    elif distribution == 'external':
+        chunk_size = min(run_size, total_numbers)
+        bounds = [(i * run_size, min((i + 1) * run_size, total_numbers)) for i in range(total_chunks)]
+    else:
+        bounds = [(i * chunk_size, (i + 1) * chunk_size if i < total_chunks - 1 else total_numbers)
+                  for i in range(total_chunks)]
+    
+    for i in range(total_chunks):
+        start_idx, end_idx = bounds[i]
         
-        sorting_progress[batch_id]['chunks'][i] = {
-            'client_id': client_id,
+        progress['chunks'][i] = {
+            'client_id': None,
             'chunk_id': i,
-            'status': 'assigned',
+            'status': 'pending',
             'start_idx': start_idx,
             'end_idx': end_idx,
             'size': end_idx - start_idx,
@@ -249,12 +969,35 @@ def start_parallel():
             'processing_time': None
         }
         
-        clients_connected[client_id]['status'] = f'processing_chunk_{i}'
+        if end_idx == start_idx:
+            # Empty value range, nothing to send out
+            progress['chunks'][i]['status'] = 'completed'
+            progress['chunks'][i]['processing_time'] = 0
+            progress['completed_chunks'] += 1
+        else:
+            progress['pending'].append(i)
+    
+    with schedule_lock:
+        sorting_progress[batch_id] = progress
+        active_batches[batch_id] = progress
+        
+        # Every idle client starts with one chunk; the rest wait in the queue
+        for client_id in idle_clients:
+            if not progress['pending']:
+                break
+            assign_chunk(batch_id, progress['chunks'][progress['pending'].popleft()], client_id)
+        work_available.notify_all()
+    
+    if progress['completed_chunks'] == total_chunks:
+        # Every chunk was empty (an empty batch), so nothing will ever be submitted
+        finish_batch(batch_id, progress, storage.write_array(f"{batch_id}_sorted", array(BATCH_TYPECODE), BATCH_TYPECODE))
     
     return jsonify({
         'status': 'started',
         'mode': 'parallel',
+        'distribution': distribution,
         'total_clients': total_clients,
+        'total_chunks': total_chunks,
         'chunk_size': chunk_size,
         'total_numbers': total_numbers,
         'assigned_clients': idle_clients
@@ -262,90 +1005,178 @@ def start_parallel():
 
 @app.route('/api/get-work/<client_id>')
 def get_work(client_id):
-    if client_id in clients_connected:
-        clients_connected[client_id]['last_seen'] = time.time()
-    
-    for batch_id, progress in sorting_progress.items():
-        for chunk_id, chunk_info in progress['chunks'].items():
-            if (chunk_info['client_id'] == client_id and 
-                chunk_info['status'] == 'assigned'):
-                
-                if progress['mode'] == 'serial':
-                    data = batches[batch_id]['numbers']
-                else:
-                    data = batches[batch_id]['numbers'][chunk_info['start_idx']:chunk_info['end_idx']]
-                
-                return jsonify({
-                    'batch_id': batch_id,
-                    'mode': progress['mode'],
-                    'algorithm': progress['algorithm'],
-                    'data': data,
-                    'chunk_id': chunk_id
-                })
-    
-    return jsonify({'status': 'no_work'})
+    touch_client(client_id)
+    
+    # ?wait=N holds the request for up to N seconds until work is assigned,
+    # ?prefetch=1 asks for a chunk other than the ones the client already has
+    wait = min(request.args.get('wait', 0, type=float), LONG_POLL_MAX_SECONDS)
+    prefetch = request.args.get('prefetch', 0, type=int) > 0
+    busy = wait > 0 and not parked_slots.acquire(blocking=False)
+    if wait > 0 and not busy:
+        try:
+            work = wait_for_chunk(client_id, wait, prefetch)
+        finally:
+            parked_slots.release()
+    else:
+        work = next_chunk(client_id, prefetch)
+    
+    touch_client(client_id)
+    
+    if work is None:
+        if busy:
+            return jsonify({'status': 'no_work', 'retry_after': LONG_POLL_BUSY_RETRY_SECONDS})
+        return jsonify({'status': 'no_work'})
+    
+    batch_id, progress, chunk_id, chunk_info = work
+    with schedule_lock:
+        delivered_work[client_id].add((batch_id, chunk_id))
+    
+    if progress['mode'] == 'serial':
+        data = batch_view(batch_id)
+    else:
+        data = batch_view(batch_id, chunk_info['start_idx'], chunk_info['end_idx'])
+    
+    if 'fingerprint' not in chunk_info:
+        # Taken once at dispatch; submit_work checks the result against it
+        chunk_info['fingerprint'] = fingerprint(data)
+    
+    client = clients_connected.get(client_id, {})
+    if client.get('wire_format') == 'binary':
+        # Streamed block by block straight from the batch, never encoded whole
+        body = protocol.iter_chunk(batch_id, chunk_id, data, meta={
+            'mode': progress['mode'],
+            'algorithm': progress['algorithm']
+        }, compression=client.get('compression', 'none'))
+        return Response(body, mimetype=protocol.BINARY_CONTENT_TYPE)
+    
+    return jsonify({
+        'batch_id': batch_id,
+        'mode': progress['mode'],
+        'algorithm': progress['algorithm'],
+        'data': data.tolist(),
+        'chunk_id': chunk_id
+    })
+
+@app.route('/api/report-progress', methods=['POST'])
+def report_progress():
+    """Record a client's progress on the chunk it is sorting"""
+    data = request.json
+    client_id = data['client_id']
+    
+    touch_client(client_id)
+    
+    progress = sorting_progress.get(data['batch_id'])
+    chunk_info = progress['chunks'].get(data['chunk_id']) if progress else None
+    if chunk_info is None or chunk_info['status'] != 'assigned':
+        return jsonify({'status': 'not_found'})
+    
+    with schedule_lock:
+        chunk_info['progress'] = data['percent']
+        chunk_info['progress_detail'] = data.get('detail', '')
+        chunk_info['elements_processed'] = data.get('elements')
+        chunk_info['throughput'] = data.get('throughput')
+    publish(f"progress:{data['batch_id']}")
+    return jsonify({'status': 'updated'})
 
 @app.route('/api/submit-work', methods=['POST'])
 def submit_work():
-    data = request.json
-    batch_id = data['batch_id']
+    if request.mimetype == protocol.BINARY_CONTENT_TYPE:
+        # Decoded as it arrives, so the body is never buffered whole
+        batch_id, chunk_id, processed_data, data = protocol.read_chunk(request.stream)
+        if processed_data.typecode != BATCH_TYPECODE:
+            processed_data = array(BATCH_TYPECODE, processed_data)
+    else:
+        data = request.json
+        batch_id = data['batch_id']
+        processed_data = array(BATCH_TYPECODE, data['processed_data'])
+        chunk_id = data.get('chunk_id', 0)
     client_id = data['client_id']
-    processed_data = data['processed_data']
     processing_time = data['processing_time']
-    chunk_id = data.get('chunk_id', 0)
     
     if batch_id not in sorting_progress:
         return jsonify({'status': 'error', 'message': 'Batch not found'})
     
     progress = sorting_progress[batch_id]
     
-    if chunk_id in progress['chunks']:
-        progress['chunks'][chunk_id]['status'] = 'completed'
-        progress['chunks'][chunk_id]['processed_data'] = processed_data
-        progress['chunks'][chunk_id]['processing_time'] = processing_time
-        progress['completed_chunks'] += 1
-        
-        clients_connected[client_id]['status'] = 'idle'
+    touch_client(client_id, status='idle')
+    publish('clients', f'progress:{batch_id}')
+    
+    if progress.get('failed'):
+        return jsonify({'status': 'error', 'message': f"Batch failed: {progress['failed']}"})
+    
+    # A result must be sorted and hold exactly the numbers that were sent out
+    chunk_info = progress['chunks'].get(chunk_id)
+    if chunk_info is not None and chunk_info['status'] != 'completed':
+        if len(processed_data) != chunk_info['size']:
+            reject_chunk(batch_id, progress, chunk_info, client_id)
+            return jsonify({'status': 'error', 'message': 'Result size does not match chunk size'})
+        expected = chunk_info.get('fingerprint')
+        if not is_sorted(processed_data) or (expected is not None and fingerprint(processed_data) != expected):
+            reject_chunk(batch_id, progress, chunk_info, client_id)
+            return jsonify({'status': 'error', 'message': 'Result failed verification'})
+    
+    # With speculative copies the first result for a chunk wins, later ones are dropped
+    with schedule_lock:
+        if (batch_id, chunk_id) in client_work.get(client_id, ()):
+            client_work[client_id].remove((batch_id, chunk_id))
+        delivered_work.get(client_id, set()).discard((batch_id, chunk_id))
+        chunk_info = progress['chunks'].get(chunk_id)
+        accepted = chunk_info is not None and chunk_info['status'] != 'completed'
+        if accepted:
+            chunk_info['status'] = 'completed'
+            chunk_info['client_id'] = client_id
+            chunk_info['processing_time'] = processing_time
+            if data.get('auto_decision'):
+                # What an auto batch's client actually ran on this chunk, and why
+                chunk_info['chosen_algorithm'] = data['auto_decision']['algorithm']
+                chunk_info['auto_decision'] = data['auto_decision']
+    
+    if accepted:
+        if progress['mode'] == 'serial':
+            progress['completed_chunks'] += 1
+            final_result = processed_data
+        elif progress.get('distribution') == 'external':
+            # Runs are kept on disk and merged from there once they are all in
+            store_external_run(batch_id, progress, chunk_id, processed_data)
+            final_result = None
+        elif progress.get('distribution') == 'range':
+            # Value ranges are disjoint and ordered, so assembly is a plain copy into place
+            final_result = assemble_range_chunk(progress, progress['chunks'][chunk_id], processed_data)
+        else:
+            # Sorted chunks go into the merge tree in the background instead of being kept per chunk
+            merge_completed_chunk(batch_id, progress, chunk_id, processed_data)
+            final_result = None
         
-        if progress['completed_chunks'] >= progress['total_chunks']:
-            if progress['mode'] == 'serial':
-                final_result = processed_data
-            else:
-                all_chunks = []
-                for chunk_info in sorted(progress['chunks'].values(), key=lambda x: x.get('start_idx', 0)):
-                    all_chunks.extend(chunk_info['processed_data'])
-                final_result = all_chunks
-            
-            progress['final_result'] = final_result
-            progress['total_time'] = time.time() - progress['start_time']
-            
-            # Calculate total processing time
-            total_processing_time = sum(chunk.get('processing_time', 0) for chunk in progress['chunks'].values())
-            
-            # Create benchmark record
-            benchmark = {
-                'batch_id': batch_id,
-                'mode': progress['mode'],
-                'algorithm': progress['algorithm'],
-                'total_numbers': len(final_result),
-                'total_time': progress['total_time'],
-                'processing_time': total_processing_time,
-                'clients_used': list(set(chunk['client_id'] for chunk in progress['chunks'].values())),
-                'clients_count': len(progress['chunks']),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            benchmark_results.append(benchmark)
-            update_performance_stats(benchmark)
-            print(f"Benchmark saved: {benchmark['mode']} {benchmark['algorithm']} - {benchmark['total_time']:.3f}s")
+        if final_result is not None:
+            finish_batch(batch_id, progress, storage.write_array(f"{batch_id}_sorted", final_result, BATCH_TYPECODE))
     
     return jsonify({'status': 'success'})
 
-@app.route('/api/progress/<batch_id>')
-def get_progress(batch_id):
-    if batch_id not in sorting_progress:
+@app.route('/api/release-work', methods=['POST'])
+def release_work():
+    """Take back a chunk a client could not sort or submit, so it is handed out again"""
+    data = request.json
+    client_id = data['client_id']
+    batch_id = data['batch_id']
+    chunk_id = data.get('chunk_id', 0)
+    
+    touch_client(client_id)
+    progress = sorting_progress.get(batch_id)
+    chunk_info = progress['chunks'].get(chunk_id) if progress else None
+    if chunk_info is None:
         return jsonify({'status': 'not_found'})
     
+    print(f"Client {client_id} released chunk {chunk_id} of {batch_id}")
+    with schedule_lock:
+        entry = (batch_id, chunk_id)
+        delivered_work.get(client_id, set()).discard(entry)
+        # A serial chunk stays with its client, which is simply sent it again
+        if release_chunk(batch_id, progress, chunk_info, client_id) and entry in client_work.get(client_id, ()):
+            client_work[client_id].remove(entry)
+        work_available.notify_all()
+    return jsonify({'status': 'released'})
+
+def progress_payload(batch_id):
     progress = sorting_progress[batch_id]
     
     response = {
@@ -354,43 +1185,118 @@ def get_progress(batch_id):
         'algorithm': progress['algorithm'],
         'completed_chunks': progress['completed_chunks'],
         'total_chunks': progress['total_chunks'],
-        'is_complete': progress['completed_chunks'] >= progress['total_chunks'],
-        'chunks': progress['chunks']
+        'is_complete': progress['completed_chunks'] >= progress['total_chunks'] and not progress.get('merging'),
+        'merging': progress.get('merging', False),
+        'failed': progress.get('failed')
     }
+    with schedule_lock:
+        response['chunks'] = {chunk_id: dict(chunk) for chunk_id, chunk in progress['chunks'].items()}
+    
+    if 'merge_throughput' in progress:
+        response['merge_time'] = progress['merge_time']
+        response['merge_throughput'] = progress['merge_throughput']
     
-    if progress.get('final_result'):
-        response['final_result'] = progress['final_result'][:100]
+    if progress.get('final_result') is not None:
+        response['final_result'] = progress['final_result'][:100].tolist()
         response['total_time'] = progress.get('total_time', 0)
     
-    return jsonify(response)
+    return response
+
+@app.route('/api/progress/<batch_id>')
+def get_progress(batch_id):
+    if batch_id not in sorting_progress:
+        return jsonify({'status': 'not_found'})
+    
+    return jsonify(progress_payload(batch_id))
+
+def benchmarks_payload():
+    with schedule_lock:
+        return {
+            'benchmarks': benchmark_results[-10:],
+            'performance_stats': dict(performance_stats,
+                                      average_times={key: list(times) for key, times in performance_stats['average_times'].items()})
+        }
 
 @app.route('/api/benchmarks')
 def get_benchmarks():
     """Get all benchmark results with performance stats"""
-    return jsonify({
-        'benchmarks': benchmark_results[-10:],
-        'performance_stats': performance_stats
-    })
+    return jsonify(benchmarks_payload())
+
+@app.route('/api/events')
+def event_stream():
+    """Single SSE stream with client, progress and benchmark updates for the dashboard"""
+    if not parked_slots.acquire(blocking=False):
+        # The dashboard falls back to polling
+        return jsonify({'status': 'error', 'message': 'Too many parked requests'}), 503
+    
+    def format_event(topic):
+        if topic.startswith('progress:'):
+            batch_id = topic.split(':', 1)[1]
+            if batch_id not in sorting_progress:
+                return None
+            return f"event: progress\ndata: {json.dumps(progress_payload(batch_id))}\n\n"
+        payload = clients_payload() if topic == 'clients' else benchmarks_payload()
+        return f"event: {topic}\ndata: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        # Start with the current clients and benchmarks, but not the progress of every old batch
+        with events_changed:
+            seen = {topic: version for topic, version in event_versions.items() if topic.startswith('progress:')}
+        
+        while True:
+            with events_changed:
+                changed = [topic for topic, version in event_versions.items() if seen.get(topic) != version]
+                if not changed:
+                    events_changed.wait(SSE_KEEPALIVE_SECONDS)
+                    changed = [topic for topic, version in event_versions.items() if seen.get(topic) != version]
+                for topic in changed:
+                    seen[topic] = event_versions[topic]
+            
+            if not changed:
+                yield ": keepalive\n\n"
+                continue
+            
+            for topic in changed:
+                event = format_event(topic)
+                if event:
+                    yield event
+            time.sleep(SSE_MIN_INTERVAL)
+    
+    response = Response(generate(), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(parked_slots.release)
+    return response
+
+# Data endpoints stream large slices in blocks of this many numbers
+STREAM_BLOCK_SIZE = 65536
+# Largest window a single JSON page may return
+MAX_PAGE_SIZE = 100000
 
 @app.route('/api/batch/<batch_id>')
 def get_batch_data(batch_id):
-    """Get full batch data for detail page"""
+    """Get batch data; ?offset=&limit= select a window of both arrays, at most MAX_PAGE_SIZE numbers"""
     if batch_id not in batches:
         return jsonify({'status': 'not_found'})
     
     batch_data = batches[batch_id]
     progress = sorting_progress.get(batch_id, {})
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    limit = min(max(request.args.get('limit', MAX_PAGE_SIZE, type=int), 0), MAX_PAGE_SIZE)
+    end = offset + limit
     
     response = {
         'batch_id': batch_id,
-        'numbers': batch_data['numbers'],
+        'offset': offset,
+        'numbers': batch_data['numbers'][offset:end].tolist(),
         'count': batch_data['count'],
         'algorithm': batch_data['algorithm'],
-        'created_at': batch_data['created_at']
+        'created_at': batch_data['created_at'],
+        'distribution': batch_data.get('distribution'),
+        'seed': batch_data.get('seed')
     }
     
-    if progress.get('final_result'):
-        response['sorted_numbers'] = progress['final_result']
+    if progress.get('final_result') is not None:
+        response['sorted_numbers'] = progress['final_result'][offset:end].tolist()
         response['total_time'] = progress.get('total_time', 0)
         response['is_complete'] = True
     else:
@@ -398,16 +1304,79 @@ def get_batch_data(batch_id):
     
     return jsonify(response)
 
+def batch_array(batch_id, name):
+    """The input ('numbers') or result ('sorted') array of a batch, if it exists"""
+    if name == 'numbers':
+        return batches[batch_id]['numbers']
+    if name == 'sorted':
+        return sorting_progress.get(batch_id, {}).get('final_result')
+    return None
+
+@app.route('/api/batch/<batch_id>/<name>')
+def get_batch_range(batch_id, name):
+    """Windowed access to a batch's numbers or sorted result.
+
+    ?offset=&limit= select the window; ?format= is json (one page),
+    ndjson (one number per line) or binary (raw little-endian ints),
+    the last two streamed in blocks so memory stays bounded.
+    """
+    if batch_id not in batches:
+        return jsonify({'status': 'not_found'}), 404
+    
+    numbers = batch_array(batch_id, name)
+    if numbers is None:
+        return jsonify({'status': 'not_found', 'message': f'No {name} data for this batch'}), 404
+    
+    total = len(numbers)
+    offset = min(max(request.args.get('offset', 0, type=int), 0), total)
+    limit = request.args.get('limit', total - offset, type=int)
+    end = min(offset + max(limit, 0), total)
+    output_format = request.args.get('format', 'json')
+    view = memoryview(numbers)[offset:end]
+    
+    if output_format == 'json':
+        if end - offset > MAX_PAGE_SIZE:
+            return jsonify({'status': 'error', 'message': f'limit exceeds {MAX_PAGE_SIZE}, use format=ndjson or binary'}), 400
+        return jsonify({
+            'batch_id': batch_id,
+            'name': name,
+            'offset': offset,
+            'total': total,
+            'values': view.tolist()
+        })
+    
+    headers = {'X-Total-Count': str(total), 'X-Offset': str(offset), 'X-Dtype': view.format}
+    
+    if output_format == 'ndjson':
+        def generate():
+            for start in range(0, len(view), STREAM_BLOCK_SIZE):
+                yield ''.join(f"{value}\n" for value in view[start:start + STREAM_BLOCK_SIZE].tolist())
+        return Response(generate(), mimetype='application/x-ndjson', headers=headers)
+    
+    if output_format == 'binary':
+        def generate():
+            for start in range(0, len(view), STREAM_BLOCK_SIZE):
+                block = view[start:start + STREAM_BLOCK_SIZE]
+                if sys.byteorder == 'big':
+                    block = array(view.format, block)
+                    block.byteswap()
+                yield bytes(block)
+        return Response(generate(), mimetype='application/octet-stream', headers=headers)
+    
+    return jsonify({'status': 'error', 'message': f'Unknown format: {output_format}'}), 400
+
 @app.route('/api/batches')
 def get_batches():
     batch_list = []
-    for batch_id, batch_data in batches.items():
+    for batch_id, batch_data in list(batches.items()):
         batch_list.append({
             'id': batch_id,
             'count': batch_data['count'],
             'created_at': batch_data['created_at'],
             'algorithm': batch_data['algorithm'],
-            'sample_data': batch_data['numbers'][:20]
+            'distribution': batch_data.get('distribution'),
+            'seed': batch_data.get('seed'),
+            'sample_data': batch_data['numbers'][:20].tolist()
         })
     
     return jsonify({'batches': batch_list})
@@ -417,12 +1386,15 @@ def reset_benchmarks():
     """Reset all benchmark data and performance stats"""
     global benchmark_results, performance_stats
     
-    benchmark_results.clear()
-    performance_stats['fastest'] = None
-    performance_stats['slowest'] = None
-    performance_stats['latest_serial'] = None
-    performance_stats['latest_parallel'] = None
-    performance_stats['average_times'].clear()
+    with schedule_lock:
+        benchmark_results.clear()
+        performance_stats['fastest'] = None
+        performance_stats['slowest'] = None
+        performance_stats['latest_serial'] = None
+        performance_stats['latest_parallel'] = None
+        performance_stats['average_times'].clear()
+    save_benchmarks()
+    publish('benchmarks')
     
     print("Benchmark data reset")
     
@@ -431,7 +1403,42 @@ def reset_benchmarks():
         'message': 'All benchmark data has been reset'
     })
 
-if __name__ == '__main__':
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Sorting Master')
+    parser.add_argument('--host', default='0.0.0.0', help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on')
+    parser.add_argument('--clients', type=int, default=EXPECTED_CLIENTS,
+                        help='Expected clients (and open dashboards); sizes the server thread pool')
+    parser.add_argument('--threads', type=int,
+                        help=f"Request threads of the production server (defaults to clients + {RESERVED_THREADS})")
+    parser.add_argument('--dev', action='store_true', help="Use Flask's development server")
+    
+    args = parser.parse_args()
+    threads = args.threads or args.clients + RESERVED_THREADS
+    
+    global parked_slots
+    parked_slots = threading.BoundedSemaphore(max(1, threads - RESERVED_THREADS))
+    
     print("Starting Master Server...")
     print("Available algorithms:", list(get_algorithm_info().keys()))
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    
+    # All state lives in this process, so scale with threads rather than
+    # worker processes (e.g. gunicorn -w 1 --threads 80 master:app)
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    
+    if serve is None or args.dev:
+        if serve is None:
+            print("waitress not available, using Flask's development server")
+        # The reloader would run a second master over the same data directory
+        app.run(host=args.host, port=args.port, debug=True, use_reloader=False, threaded=True)
+    else:
+        print(f"Serving on {args.host}:{args.port} with {threads} threads")
+        serve(app, host=args.host, port=args.port, threads=threads)
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,164 @@
+# protocol.py
+import io
+import json
+import struct
+import sys
+from array import array
+from itertools import islice
+
+# Optional compressors, used only when both sides have them installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+BINARY_CONTENT_TYPE = 'application/x-sort-chunk'
+WIRE_FORMATS = ['binary', 'json']
+
+MAGIC = b'SRT1'
+
+# magic, dtype typecode, compression, batch_id length, chunk_id, element count, metadata length
+HEADER = struct.Struct('<4scBHIQI')
+
+# Streamed chunks are encoded and decoded this many numbers at a time
+STREAM_BLOCK_SIZE = 65536
+
+COMPRESSION_CODES = {'none': 0, 'zstd': 1, 'lz4': 2}
+COMPRESSION_NAMES = {code: name for name, code in COMPRESSION_CODES.items()}
+
+def available_compressions():
+    """Compression codecs usable on this machine, best first"""
+    codecs = []
+    if zstandard is not None:
+        codecs.append('zstd')
+    if lz4 is not None:
+        codecs.append('lz4')
+    codecs.append('none')
+    return codecs
+
+def negotiate(client_formats, client_compressions):
+    """Pick the wire format and compression for a client at registration"""
+    wire_format = next((f for f in client_formats or ['json'] if f in WIRE_FORMATS), 'json')
+    ours = available_compressions()
+    compression = next((c for c in client_compressions or [] if c in ours), 'none')
+    return wire_format, compression
+
+def _compressor(compression):
+    """(header, compress, flush) for streaming a payload through a codec"""
+    if compression == 'zstd':
+        compressor = zstandard.ZstdCompressor(level=1).compressobj()
+        return b'', compressor.compress, compressor.flush
+    if compression == 'lz4':
+        compressor = lz4.frame.LZ4FrameCompressor()
+        return compressor.begin(), compressor.compress, compressor.flush
+    return b'', bytes, bytes
+
+def _decompressor(compression):
+    if compression == 'zstd':
+        return zstandard.ZstdDecompressor().decompressobj().decompress
+    if compression == 'lz4':
+        return lz4.frame.LZ4FrameDecompressor().decompress
+    return bytes
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            raise ValueError("Truncated binary sort chunk")
+        data += more
+    return data
+
+def _blocks(numbers, view, typecode):
+    if view is not None:
+        for start in range(0, len(view), STREAM_BLOCK_SIZE):
+            yield view[start:start + STREAM_BLOCK_SIZE]
+        return
+    values = iter(numbers)
+    while True:
+        block = array(typecode, islice(values, STREAM_BLOCK_SIZE))
+        if not block:
+            break
+        yield block
+
+def iter_chunk(batch_id, chunk_id, numbers, meta=None, compression='none', typecode='i', count=None):
+    """Encode a chunk block by block, for streaming it as a request/response body.
+
+    Arrays, memoryviews and other buffers such as NumPy arrays are sent as
+    slices of their own buffer; any other iterable of ints is packed
+    STREAM_BLOCK_SIZE numbers at a time (count is needed when it has no len()).
+    """
+    try:
+        view = memoryview(numbers)
+        typecode = view.format
+    except TypeError:
+        view = None
+    count = len(numbers) if count is None else count
+
+    batch_key = batch_id.encode('utf-8')
+    meta_bytes = json.dumps(meta or {}).encode('utf-8')
+    yield HEADER.pack(MAGIC, typecode.encode('ascii'), COMPRESSION_CODES[compression],
+                      len(batch_key), chunk_id, count, len(meta_bytes)) + batch_key + meta_bytes
+
+    header, compress, flush = _compressor(compression)
+    if header:
+        yield header
+    for block in _blocks(numbers, view, typecode):
+        if sys.byteorder == 'big':
+            block = array(typecode, block)
+            block.byteswap()
+        payload = compress(block)
+        if payload:
+            yield payload
+    tail = flush()
+    if tail:
+        yield tail
+
+def encode_chunk(batch_id, chunk_id, numbers, meta=None, compression='none', typecode='i'):
+    """Encode a chunk as header + metadata + raw little-endian ints.
+
+    numbers can be an array, a memoryview over one, or any iterable of ints.
+    """
+    if not isinstance(numbers, (array, memoryview)):
+        numbers = array(typecode, numbers)
+    return b''.join(iter_chunk(batch_id, chunk_id, numbers, meta, compression, typecode))
+
+def read_chunk(stream, block_size=STREAM_BLOCK_SIZE):
+    """Decode a binary chunk from a file-like stream as it arrives.
+
+    Returns (batch_id, chunk_id, numbers, meta); the payload is decoded
+    straight into the numbers array instead of being buffered whole first.
+    """
+    magic, typecode, compression, key_len, chunk_id, count, meta_len = HEADER.unpack(_read_exactly(stream, HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a binary sort chunk")
+
+    batch_id = _read_exactly(stream, key_len).decode('utf-8')
+    meta = json.loads(_read_exactly(stream, meta_len) or b'{}')
+
+    numbers = array(typecode.decode('ascii'))
+    decompress = _decompressor(COMPRESSION_NAMES[compression])
+    pending = b''
+    while True:
+        raw = stream.read(block_size * numbers.itemsize)
+        if not raw:
+            break
+        data = pending + decompress(raw)
+        usable = len(data) - len(data) % numbers.itemsize
+        numbers.frombytes(data[:usable])
+        pending = data[usable:]
+    if sys.byteorder == 'big':
+        numbers.byteswap()
+    if pending or len(numbers) != count:
+        raise ValueError(f"Chunk size mismatch: expected {count}, got {len(numbers)}")
+
+    return batch_id, chunk_id, numbers, meta
+
+def decode_chunk(body):
+    """Decode a binary chunk, returning (batch_id, chunk_id, numbers, meta)"""
+    return read_chunk(io.BytesIO(body))
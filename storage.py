@@ -0,0 +1,125 @@
+# storage.py
+import json
+import mmap
+import os
+import sys
+from array import array
+
+# Where batches, results and metadata are kept between master restarts
+DATA_DIR = os.environ.get('SORT_DATA_DIR', 'data')
+
+# Open memory maps, so they can be closed before their file is deleted
+_mapped = {}
+
+def _path(name, extension):
+    return os.path.join(DATA_DIR, f"{name}.{extension}")
+
+def _unmap(name):
+    """Forget a memory map, closing it unless views of it are still in use"""
+    mapped, view = _mapped.pop(name, (None, None))
+    if mapped is not None:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # Still referenced by an in-flight response; the map closes once that finishes
+            pass
+
+def write_array(name, blocks, typecode='i'):
+    """Write numbers to <name>.bin and return a memory-mapped view of them.
+
+    blocks is an array or an iterable of arrays/buffers, written one after
+    another, so a batch can be produced block by block without ever being
+    held in memory as a whole. Numbers are stored little-endian.
+    """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if isinstance(blocks, (array, memoryview)):
+        blocks = [blocks]
+
+    temp_path = _path(name, 'bin.tmp')
+    try:
+        with open(temp_path, 'wb') as f:
+            for block in blocks:
+                if sys.byteorder == 'big':
+                    block = array(typecode, block)
+                    block.byteswap()
+                f.write(block)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    _unmap(name)
+    os.replace(temp_path, _path(name, 'bin'))
+
+    return map_array(name, typecode)
+
+def map_array(name, typecode='i'):
+    """Memory-map a stored array read-only; returns a memoryview of ints"""
+    if name in _mapped:
+        return _mapped[name][1]
+
+    path = _path(name, 'bin')
+    if os.path.getsize(path) == 0:
+        # mmap can't map empty files
+        return memoryview(array(typecode))
+
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped).cast(typecode)
+    if sys.byteorder == 'big':
+        # Stored little-endian; big-endian hosts get an in-memory swapped copy
+        swapped = array(typecode, view)
+        swapped.byteswap()
+        view = memoryview(swapped)
+    _mapped[name] = (mapped, view)
+    return view
+
+def read_values(name, block_size, typecode='i'):
+    """Yield the numbers of a stored array, reading block_size at a time"""
+    view = map_array(name, typecode)
+    for start in range(0, len(view), block_size):
+        yield from view[start:start + block_size].tolist()
+
+def array_exists(name):
+    return os.path.exists(_path(name, 'bin'))
+
+def delete_array(name):
+    """Unmap and delete a stored array"""
+    _unmap(name)
+    try:
+        os.remove(_path(name, 'bin'))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Could not delete {name}: {e}")
+
+def save_metadata(name, data):
+    """Atomically write a JSON metadata file"""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    temp_path = _path(name, 'json.tmp')
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, _path(name, 'json'))
+
+def delete_metadata(name):
+    try:
+        os.remove(_path(name, 'json'))
+    except FileNotFoundError:
+        pass
+
+def list_metadata(suffix=''):
+    """Names of the stored metadata files ending in suffix"""
+    if not os.path.isdir(DATA_DIR):
+        return []
+    return sorted(entry[:-len('.json')] for entry in os.listdir(DATA_DIR)
+                  if entry.endswith(f"{suffix}.json"))
+
+def load_metadata(name, default=None):
+    """Read a JSON metadata file, or return default if it doesn't exist"""
+    try:
+        with open(_path(name, 'json')) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except ValueError as e:
+        print(f"Ignoring unreadable metadata {name}: {e}")
+        return default